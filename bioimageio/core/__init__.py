@@ -10,6 +10,17 @@ from .resource_io import (
     save_raw_resource_description,
     serialize_raw_resource_description,
 )
-from .prediction_pipeline import create_prediction_pipeline
-from .prediction import predict_image, predict_images, predict_with_padding, predict_with_tiling
+from .prediction_pipeline import acreate_prediction_pipeline, create_prediction_pipeline
+from .prediction import (
+    ShapeBuckets,
+    apredict,
+    apredict_with_padding,
+    apredict_with_tiling,
+    predict_image,
+    predict_images,
+    predict_stream,
+    predict_with_dask,
+    predict_with_padding,
+    predict_with_tiling,
+)
 from .resource_tests import check_input_shape, check_output_shape, test_resource
@@ -11,7 +11,14 @@ from typing import List, Optional
 
 import typer
 
-from bioimageio.core import __version__, prediction, commands, resource_tests, load_raw_resource_description
+from bioimageio.core import (
+    __version__,
+    prediction,
+    commands,
+    resource_tests,
+    load_raw_resource_description,
+    image_helper,
+)
 from bioimageio.core.common import TestSummary
 from bioimageio.core.prediction_pipeline import get_weight_formats
 from bioimageio.spec.__main__ import app, help_version as help_version_spec
@@ -191,6 +198,12 @@ def predict_image(
     tiling: Optional[bool] = typer.Option(None, help="Whether to run prediction in tiling mode."),
     weight_format: Optional[WeightFormatEnum] = typer.Option(None, help="The weight format to use."),
     devices: Optional[List[str]] = typer.Option(None, help="Devices for running the model."),
+    mmap: bool = typer.Option(False, help="Read .npy and tiff inputs lazily and write tiled .npy outputs to disk."),
+    multichannel: str = typer.Option(
+        "split", help="Save multi-channel tiff outputs as separate files ('split'), 'imagej' hyperstack or 'ome' tiff."
+    ),
+    compression: Optional[str] = typer.Option(None, help="Compression of tiff outputs, e.g. 'zlib'."),
+    n_scales: int = typer.Option(1, help="Number of resolution levels of zarr or hdf5 outputs."),
 ):
 
     if isinstance(padding, str):
@@ -204,19 +217,46 @@ def predict_image(
     if len(devices) == 0:
         devices = None
     prediction.predict_image(
-        model_rdf, inputs, outputs, padding, tiling, None if weight_format is None else weight_format.value, devices
+        model_rdf,
+        inputs,
+        outputs,
+        padding,
+        tiling,
+        None if weight_format is None else weight_format.value,
+        devices,
+        mmap=mmap,
+        multichannel=multichannel,
+        compression=compression,
+        n_scales=n_scales,
     )
 
 
 predict_image.__doc__ = prediction.predict_image.__doc__
 
 
+def _get_output_path(input_file: str, output_folder: str, dataset: str, output_extension: Optional[str]) -> str:
+    """get the output path of an input file (or input container) in the output folder; the output extension
+    replaces the extension of the output file, or of the container if the output is a dataset in a container"""
+    output_file = image_helper.join_dataset_path(os.path.join(output_folder, os.path.split(input_file)[1]), dataset)
+    if output_extension is None:
+        return output_file
+
+    dataset_path = image_helper.split_dataset_path(output_file)
+    if dataset_path is None:
+        return f"{os.path.splitext(output_file)[0]}{output_extension}"
+
+    _, container, key = dataset_path
+    return image_helper.join_dataset_path(f"{os.path.splitext(container)[0]}{output_extension}", key)
+
+
 @app.command()
 def predict_images(
     model_rdf: Path = typer.Argument(
         ..., help="Path to the model resource description file (rdf.yaml) or zipped model."
     ),
-    input_pattern: str = typer.Argument(..., help="Glob pattern for the input images."),
+    input_pattern: str = typer.Argument(
+        ..., help="Glob pattern for the input images, or for the containers of datasets like 'data/*.zarr/raw'."
+    ),
     output_folder: str = typer.Argument(..., help="Folder to save the outputs."),
     output_extension: Optional[str] = typer.Argument(None, help="Optional output extension."),
     # NOTE: typer currently doesn't support union types, so we only support boolean here
@@ -230,12 +270,24 @@ def predict_images(
     tiling: Optional[bool] = typer.Option(None, help="Whether to run prediction in tiling mode."),
     weight_format: Optional[WeightFormatEnum] = typer.Option(None, help="The weight format to use."),
     devices: Optional[List[str]] = typer.Option(None, help="Devices for running the model."),
+    num_io_workers: int = typer.Option(0, help="Number of threads for loading and saving the images."),
+    batch_size: int = typer.Option(1, help="Number of images of the same shape to predict together."),
+    num_workers: int = typer.Option(0, help="Number of processes that predict the images in parallel."),
+    mmap: bool = typer.Option(False, help="Read .npy and tiff inputs lazily and write tiled .npy outputs to disk."),
+    multichannel: str = typer.Option(
+        "split", help="Save multi-channel tiff outputs as separate files ('split'), 'imagej' hyperstack or 'ome' tiff."
+    ),
+    compression: Optional[str] = typer.Option(None, help="Compression of tiff outputs, e.g. 'zlib'."),
+    n_scales: int = typer.Option(1, help="Number of resolution levels of zarr or hdf5 outputs."),
 ):
+    # for datasets in chunked containers, e.g. 'data/*.zarr/raw', the pattern matches the containers
+    # and the outputs are saved to the same dataset in the output containers
+    dataset_path = image_helper.split_dataset_path(input_pattern)
+    input_pattern, dataset = (input_pattern, "") if dataset_path is None else dataset_path[1:]
+
     input_files = glob(input_pattern)
-    input_names = [os.path.split(infile)[1] for infile in input_files]
-    output_files = [os.path.join(output_folder, fname) for fname in input_names]
-    if output_extension is not None:
-        output_files = [f"{os.path.splitext(outfile)[0]}{output_extension}" for outfile in output_files]
+    output_files = [_get_output_path(infile, output_folder, dataset, output_extension) for infile in input_files]
+    input_files = [image_helper.join_dataset_path(infile, dataset) for infile in input_files]
 
     if isinstance(padding, str):
         padding = json.loads(padding.replace("'", '"'))
@@ -256,6 +308,13 @@ def predict_images(
         weight_format=None if weight_format is None else weight_format.value,
         devices=devices,
         verbose=True,
+        num_io_workers=num_io_workers,
+        batch_size=batch_size,
+        num_workers=num_workers,
+        mmap=mmap,
+        multichannel=multichannel,
+        compression=compression,
+        n_scales=n_scales,
     )
 
 
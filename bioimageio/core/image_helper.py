@@ -1,12 +1,30 @@
+import abc
+import functools
+import itertools
+import json
 import os
+import re
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
-from typing import Dict, List, Optional, Sequence, Tuple, Union
+from typing import Any, DefaultDict, Dict, List, Optional, Sequence, Tuple, Union
 
 import imageio
 import numpy as np
+import tifffile
 from xarray import DataArray
 from bioimageio.core.resource_io.nodes import InputTensor, OutputTensor
 
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+try:
+    import zarr
+except ImportError:
+    zarr = None
 
 #
 # helper functions to transform input images / output tensors to the required axes
@@ -23,18 +41,7 @@ def transform_input_image(image: np.ndarray, tensor_axes: str, image_axes: Optio
     """
     # if the image axes are not given deduce them from the required axes and image shape
     if image_axes is None:
-        has_z_axis = "z" in tensor_axes
-        ndim = image.ndim
-        if ndim == 2:
-            image_axes = "yx"
-        elif ndim == 3:
-            image_axes = "zyx" if has_z_axis else "cyx"
-        elif ndim == 4:
-            image_axes = "czyx"
-        elif ndim == 5:
-            image_axes = "bczyx"
-        else:
-            raise ValueError(f"Invalid number of image dimensions: {ndim}")
+        image_axes = _get_image_axes(image.ndim, tensor_axes)
     tensor = DataArray(image, dims=tuple(image_axes))
     # expand the missing image axes
     missing_axes = tuple(set(tensor_axes) - set(image_axes))
@@ -45,6 +52,20 @@ def transform_input_image(image: np.ndarray, tensor_axes: str, image_axes: Optio
     return tensor.values
 
 
+def _get_image_axes(ndim: int, tensor_axes: str) -> str:
+    has_z_axis = "z" in tensor_axes
+    if ndim == 2:
+        return "yx"
+    elif ndim == 3:
+        return "zyx" if has_z_axis else "cyx"
+    elif ndim == 4:
+        return "czyx"
+    elif ndim == 5:
+        return "bczyx"
+    else:
+        raise ValueError(f"Invalid number of image dimensions: {ndim}")
+
+
 def _drop_axis_default(axis_name, axis_len):
     # spatial axes: drop at middle coordnate
     # other axes (channel or batch): drop at 0 coordinate
@@ -87,23 +108,515 @@ def to_channel_last(image):
 #
 
 
-def load_image(in_path, axes: Sequence[str]) -> DataArray:
+def _memmap_tiff(in_path) -> Optional[np.ndarray]:
+    """memory map the first series of a tiff file, returns None if the data is compressed or not contiguous"""
+    try:
+        return tifffile.memmap(in_path, series=0, mode="r")
+    except ValueError:
+        return None
+
+
+def load_image(in_path, axes: Sequence[str], mmap: bool = False) -> DataArray:
+    if split_dataset_path(in_path) is not None:
+        with _open_dataset_array(in_path, axes) as dataset:
+            return DataArray(dataset[()], dims=axes)
+
     ext = os.path.splitext(in_path)[1]
+    is_volume = "z" in axes
     if ext == ".npy":
-        im = np.load(in_path)
+        # memory mapped arrays are only read from disk when they are accessed, e.g. tile by tile
+        im = np.load(in_path, mmap_mode="r" if mmap else None)
     else:
-        is_volume = "z" in axes
-        im = imageio.volread(in_path) if is_volume else imageio.imread(in_path)
+        im = _memmap_tiff(in_path) if mmap and ext in (".tif", ".tiff") else None
+        if im is None:
+            im = imageio.volread(in_path) if is_volume else imageio.imread(in_path)
         im = transform_input_image(im, axes)
     return DataArray(im, dims=axes)
 
 
-def load_tensors(sources, tensor_specs: List[Union[InputTensor, OutputTensor]]) -> List[DataArray]:
-    return [load_image(s, sspec.axes) for s, sspec in zip(sources, tensor_specs)]
+class _LazyImage(abc.ABC):
+    """Read-only array of an image that is stored with the given image axes, which is indexed with the tensor axes.
+    Only the region of the image that is indexed is read.
+
+    It supports indexing with slices, e.g. in predict_with_tiling.
+    Use it as a context manager (or call close) to release the underlying file.
+    """
+
+    def __init__(self, image_shape: Sequence[int], dtype, axes: Sequence[str], image_axes: Sequence[str]):
+        self.axes = tuple(axes)
+        self.dtype = np.dtype(dtype)
+        self._image_axes = tuple(image_axes)
+        self._image_shape = tuple(image_shape)
+        if not set(self._image_axes).issubset(self.axes):
+            raise ValueError(f"Cannot map the image axes {self._image_axes} to the axes {self.axes}")
+        image_sizes = dict(zip(self._image_axes, self._image_shape))
+        self.shape = tuple(image_sizes.get(ax, 1) for ax in self.axes)
+        self.ndim = len(self.shape)
+
+    @abc.abstractmethod
+    def _read(self, image_key: Tuple[slice, ...]) -> np.ndarray:
+        """read the region of the image with the image axes"""
+
+    def __getitem__(self, key) -> np.ndarray:
+        if not isinstance(key, tuple):
+            key = (key,)
+        if len(key) > self.ndim or not all(isinstance(k, slice) for k in key):
+            raise NotImplementedError(f"Only indexing with up to {self.ndim} slices is supported, got {key}")
+        key = dict(zip(self.axes, key + (slice(None),) * (self.ndim - len(key))))
+        image = self._read(tuple(key[ax] for ax in self._image_axes))
+
+        # expand the missing axes and index them
+        tensor = transform_input_image(image, "".join(self.axes), "".join(self._image_axes))
+        return tensor[tuple(slice(None) if ax in self._image_axes else key[ax] for ax in self.axes)]
+
+    def __array__(self, dtype=None):
+        return np.asarray(self[()], dtype=dtype)
+
+    def close(self):
+        """release the underlying file, if the image keeps it open"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+
+class TiffArray(_LazyImage):
+    """Read-only array of the first series of a tiff file with the given tensor axes, that only decodes
+    the pages of the tiff file that overlap the requested region, e.g. the z-slices of a tile.
+    """
+
+    def __init__(self, in_path, axes: Sequence[str]):
+        self._tif = tifffile.TiffFile(in_path)
+        # tile prefetching reads from several threads, but the file handle can only read one page at a time
+        self._lock = threading.Lock()
+        # the pages of the last read are kept, because neighbouring tiles overlap the same pages
+        self._cache: Dict[int, np.ndarray] = {}
+        series = self._tif.series[0]
+        self._page_shape = tuple(series.keyframe.shape)
+        self._n_page_axes = len(series.shape) - len(self._page_shape)
+        super().__init__(series.shape, series.dtype, axes, _get_image_axes(len(series.shape), "".join(axes)))
+
+    def _read(self, image_key: Tuple[slice, ...]) -> np.ndarray:
+        # decode the pages that overlap the region of the axes that index the pages, then crop them
+        lead_shape = self._image_shape[: self._n_page_axes]
+        page_ranges = [range(*k.indices(sh)) for k, sh in zip(image_key, lead_shape)]
+        page_ids = [int(np.ravel_multi_index(idx, lead_shape)) for idx in itertools.product(*page_ranges)]
+        with self._lock:
+            missing = [pid for pid in page_ids if pid not in self._cache]
+            if missing:
+                decoded = self._tif.asarray(key=missing, series=0).reshape((len(missing),) + self._page_shape)
+                self._cache.update(zip(missing, decoded))
+            cache = self._cache
+            self._cache = {pid: cache[pid] for pid in page_ids}
+
+        pages_shape = tuple(len(rng) for rng in page_ranges) + self._page_shape
+        if page_ids:
+            pages = np.stack([cache[pid] for pid in page_ids]).reshape(pages_shape)
+        else:
+            pages = np.empty(pages_shape, dtype=self.dtype)
+        return pages[(slice(None),) * self._n_page_axes + image_key[self._n_page_axes :]]
+
+    def close(self):
+        self._tif.close()
+
+
+class DatasetArray(_LazyImage):
+    """Read-only array of a dataset in a chunked container (see IO_BACKENDS) with the given tensor axes.
+    Only the chunks that overlap the requested region are read.
+    """
+
+    def __init__(
+        self,
+        dataset,
+        axes: Sequence[str],
+        image_axes: Optional[Sequence[str]] = None,
+        backend: Optional["IOBackend"] = None,
+    ):
+        self.dataset = dataset
+        self._backend = backend
+        if image_axes is None:
+            image_axes = _get_image_axes(len(dataset.shape), "".join(axes))
+        super().__init__(dataset.shape, dataset.dtype, axes, image_axes)
+
+    def _read(self, image_key: Tuple[slice, ...]) -> np.ndarray:
+        return np.asarray(self.dataset[image_key])
+
+    def close(self):
+        if self._backend is not None:
+            self._backend.close_dataset(self.dataset)
+
+
+#
+# backends for chunked array containers, whose datasets are addressed by the path of the container
+# and the path of the dataset inside of it, e.g. file.zarr/raw or file.h5:/volume
+#
+
+
+class IOBackend(abc.ABC):
+    """Open and create the datasets of a container format.
+
+    The axes of a dataset are stored in its "axes" attribute, the "_ARRAY_DIMENSIONS" attribute written by xarray
+    is also understood.
+    """
+
+    extensions: Tuple[str, ...] = ()
+
+    @abc.abstractmethod
+    def open_dataset(self, container: str, key: str, mode: str = "r"):
+        """open an existing dataset"""
+
+    @abc.abstractmethod
+    def create_dataset(self, container: str, key: str, shape: Sequence[int], dtype, chunks: Optional[Sequence[int]]):
+        """create (or overwrite) a dataset that can be written to"""
+
+    def get_axes(self, dataset) -> Optional[str]:
+        axes = dataset.attrs.get("axes", dataset.attrs.get("_ARRAY_DIMENSIONS"))
+        return None if axes is None else "".join(axes)
+
+    def set_axes(self, dataset, axes: Sequence[str]):
+        dataset.attrs["axes"] = "".join(axes)
+
+    @abc.abstractmethod
+    def set_group_attrs(self, container: str, key: str, attrs: Dict[str, Any]):
+        """create the group if it does not exist and update its attributes"""
+
+    def close_dataset(self, dataset):
+        """release the file of a dataset that was opened or created by this backend"""
+
+
+class ZarrBackend(IOBackend):
+    extensions = (".zarr", ".n5")
+
+    def _get_store(self, container: str):
+        if zarr is None:
+            raise ImportError(f"Reading and writing {container} requires zarr")
+        return zarr.N5Store(container) if container.endswith(".n5") else zarr.DirectoryStore(container)
+
+    def open_dataset(self, container: str, key: str, mode: str = "r"):
+        return zarr.open_array(self._get_store(container), mode=mode, path=key)
+
+    def create_dataset(self, container: str, key: str, shape: Sequence[int], dtype, chunks: Optional[Sequence[int]]):
+        group = zarr.open_group(self._get_store(container), mode="a")
+        return group.create_dataset(key, shape=tuple(shape), dtype=dtype, chunks=chunks or True, overwrite=True)
+
+    def set_group_attrs(self, container: str, key: str, attrs: Dict[str, Any]):
+        zarr.open_group(self._get_store(container), mode="a", path=key).attrs.update(attrs)
+
+
+class H5Backend(IOBackend):
+    extensions = (".h5", ".hdf5", ".hdf")
+
+    def open_dataset(self, container: str, key: str, mode: str = "r"):
+        if h5py is None:
+            raise ImportError(f"Reading {container} requires h5py")
+        # the file is kept open for reading the dataset, see close_dataset
+        return h5py.File(container, mode)[key]
+
+    def create_dataset(self, container: str, key: str, shape: Sequence[int], dtype, chunks: Optional[Sequence[int]]):
+        if h5py is None:
+            raise ImportError(f"Writing {container} requires h5py")
+        f = h5py.File(container, "a")
+        if key in f:
+            del f[key]
+        return f.create_dataset(key, shape=tuple(shape), dtype=dtype, chunks=tuple(chunks) if chunks else None)
+
+    def set_group_attrs(self, container: str, key: str, attrs: Dict[str, Any]):
+        if h5py is None:
+            raise ImportError(f"Writing {container} requires h5py")
+        with h5py.File(container, "a") as f:
+            group = f.require_group(key) if key else f
+            for name, value in attrs.items():  # hdf5 attributes can't hold nested metadata, so it is stored as json
+                group.attrs[name] = value if isinstance(value, (str, int, float)) else json.dumps(value)
 
+    def close_dataset(self, dataset):
+        # closing the file flushes the written data and releases the lock of the file
+        dataset.file.close()
+
+
+# the io backends for the container file extensions
+IO_BACKENDS: Dict[str, IOBackend] = {}
+
+
+def register_io_backend(backend: IOBackend):
+    for ext in backend.extensions:
+        IO_BACKENDS[ext] = backend
+
+
+register_io_backend(ZarrBackend())
+register_io_backend(H5Backend())
+
+
+def split_dataset_path(path) -> Optional[Tuple[IOBackend, str, str]]:
+    """split a path like file.zarr/raw, file.n5/raw or file.h5:/volume into its io backend, the container
+    and the dataset inside of it. Returns None if the path does not point into a container of a known backend.
+    """
+    path = os.fspath(path)
+    match = None
+    for ext in IO_BACKENDS:
+        ext_match = re.search(rf"{re.escape(ext)}(?=$|[:/\\])", path)
+        if ext_match is not None and (match is None or ext_match.end() < match.end()):
+            match = ext_match
+
+    if match is None:
+        return None
+    return IO_BACKENDS[match.group()], path[: match.end()], path[match.end() :].lstrip(":/\\")
+
+
+def join_dataset_path(container, key: str) -> str:
+    return f"{os.fspath(container)}/{key}" if key else os.fspath(container)
+
+
+def open_dataset(path, mode: str = "r"):
+    """open the dataset of a container path like file.zarr/raw or file.h5:/volume"""
+    split = split_dataset_path(path)
+    if split is None:
+        raise ValueError(f"{path} does not point to a dataset of a known container format {tuple(IO_BACKENDS)}")
+    backend, container, key = split
+    return backend.open_dataset(container, key, mode=mode)
+
+
+def _downsample(image: np.ndarray, factors: Sequence[int], method: str) -> np.ndarray:
+    """downsample an image by integer factors per axis, blocks at the border may be incomplete"""
+    if method == "nearest":
+        return image[tuple(slice(None, None, f) for f in factors)]
+    elif method == "mean":
+        result = image.astype("float64")
+        for axis, f in enumerate(factors):
+            if f > 1:
+                starts = np.arange(0, image.shape[axis], f)
+                block_sizes = np.diff(np.append(starts, image.shape[axis]))
+                block_shape = [1] * image.ndim
+                block_shape[axis] = len(starts)
+                result = np.add.reduceat(result, starts, axis=axis) / block_sizes.reshape(block_shape)
+        if np.issubdtype(image.dtype, np.integer):
+            result = np.round(result)
+        return result.astype(image.dtype)
+    else:
+        raise ValueError(f"Invalid downsampling method {method}, expected 'mean' or 'nearest'")
+
+
+# the axis types of OME-Zarr, the batch axis has no type
+_OME_AXIS_TYPES = {"t": "time", "c": "channel", "z": "space", "y": "space", "x": "space"}
+
+
+class MultiscaleOutput:
+    """Output in a chunked container that is written part by part, e.g. tile by tile, and stored as a multiscale
+    group in the layout of OME-Zarr: the datasets '0', '1', ... hold the image downsampled by factor ** level
+    and the group attribute 'multiscales' describes the levels.
+
+    The downsampled levels are updated with each written region, so no second pass over the output is needed.
+    The blocks of a level that overlap the written region are recomputed from the level above, so blocks that
+    are shared with the neighbouring regions are complete once all of their regions are written.
+    """
+
+    def __init__(
+        self,
+        out_path,
+        shape: Sequence[int],
+        dtype,
+        axes: Sequence[str],
+        chunks: Optional[Sequence[int]] = None,
+        n_scales: int = 4,
+        factor: int = 2,
+        scale_axes: Sequence[str] = ("z", "y", "x"),
+        method: str = "mean",
+    ):
+        assert n_scales >= 1
+        assert factor > 1
+        split = split_dataset_path(out_path)
+        if split is None:
+            raise ValueError(f"Multiscale outputs need a dataset path like out.zarr/pred, got {out_path}")
+        backend, container, key = split
+
+        self._backend = backend
+        self.axes = tuple(axes)
+        self.shape = tuple(shape)
+        self.ndim = len(self.shape)
+        self.dtype = np.dtype(dtype)
+        self.method = method
+        self._factors = tuple(factor if ax in scale_axes else 1 for ax in self.axes)
+
+        self.levels = []
+        for level in range(n_scales):
+            level_shape = tuple(-(-sh // f**level) for sh, f in zip(self.shape, self._factors))
+            level_chunks = None if chunks is None else tuple(min(c, sh) for c, sh in zip(chunks, level_shape))
+            dataset = backend.create_dataset(container, f"{key}/{level}".lstrip("/"), level_shape, dtype, level_chunks)
+            backend.set_axes(dataset, self.axes)
+            self.levels.append(dataset)
+
+        ome_axes = [
+            {"name": ax, "type": _OME_AXIS_TYPES[ax]} if ax in _OME_AXIS_TYPES else {"name": ax} for ax in self.axes
+        ]
+        datasets = [
+            {
+                "path": str(level),
+                "coordinateTransformations": [{"type": "scale", "scale": [float(f**level) for f in self._factors]}],
+            }
+            for level in range(n_scales)
+        ]
+        multiscales = {"version": "0.4", "axes": ome_axes, "datasets": datasets, "type": method}
+        backend.set_group_attrs(container, key, {"multiscales": [multiscales]})
+
+    def __getitem__(self, key):
+        return self.levels[0][key]
+
+    def __setitem__(self, key, value):
+        if not isinstance(key, tuple):
+            key = (key,)
+        if key == (Ellipsis,):
+            key = ()
+        key = key + (slice(None),) * (self.ndim - len(key))
+        if not all(isinstance(k, slice) and k.step in (None, 1) for k in key):
+            raise NotImplementedError(f"MultiscaleOutput only supports writing to regions given by slices, got {key}")
+
+        self.levels[0][key] = value
+        region = [k.indices(sh)[:2] for k, sh in zip(key, self.shape)]
+        for level in range(1, len(self.levels)):
+            src = self.levels[level - 1]
+            # the blocks overlapping the region and the region of the level above that they are computed from
+            region = [(start // f, -(-stop // f)) for (start, stop), f in zip(region, self._factors)]
+            src_key = tuple(
+                slice(start * f, min(stop * f, sh)) for (start, stop), f, sh in zip(region, self._factors, src.shape)
+            )
+            self.levels[level][_to_slices(region)] = _downsample(np.asarray(src[src_key]), self._factors, self.method)
+
+    def flush(self):
+        for dataset in self.levels:
+            if hasattr(dataset, "flush"):
+                dataset.flush()
+
+    def close(self):
+        """release the files of the levels, which can't be written afterwards"""
+        for dataset in self.levels:
+            self._backend.close_dataset(dataset)
+
+
+def _to_slices(bounds: Sequence[Sequence[int]]) -> Tuple[slice, ...]:
+    return tuple(slice(start, stop) for start, stop in bounds)
+
+
+def _open_dataset_array(path, axes: Sequence[str]) -> DatasetArray:
+    backend, container, key = split_dataset_path(path)
+    dataset = backend.open_dataset(container, key)
+    return DatasetArray(dataset, axes, backend.get_axes(dataset), backend=backend)
+
+
+def open_image(in_path, axes: Sequence[str]) -> Union[DataArray, _LazyImage]:
+    """Open an image for tiled prediction without reading it into memory where possible.
+
+    .npy files and uncompressed tiff files are memory mapped, datasets in chunked containers are read chunk by chunk,
+    the pages of other tiff volumes are decoded when they are indexed and all other images are loaded with load_image.
+    """
+    if split_dataset_path(in_path) is not None:
+        return _open_dataset_array(in_path, axes)
+    ext = os.path.splitext(in_path)[1]
+    if ext in (".tif", ".tiff") and "z" in axes and _memmap_tiff(in_path) is None:
+        return TiffArray(in_path, axes)
+    return load_image(in_path, axes, mmap=True)
+
+
+def load_tensors(sources, tensor_specs: List[Union[InputTensor, OutputTensor]], mmap: bool = False) -> List[DataArray]:
+    return [load_image(s, sspec.axes, mmap=mmap) for s, sspec in zip(sources, tensor_specs)]
+
+
+def open_output(
+    out_path,
+    shape: Sequence[int],
+    dtype,
+    axes: Sequence[str],
+    chunks: Optional[Sequence[int]] = None,
+    n_scales: int = 1,
+):
+    """Create an output with the given axes, that can be written part by part, e.g. tile by tile.
+
+    Args:
+        out_path: a .npy file, which is memory mapped, or a dataset path in a chunked container like file.zarr/raw.
+        shape: the shape of the output.
+        dtype: the data type of the output.
+        axes: the axes of the output, which are stored as metadata of container datasets.
+        chunks: the chunk shape of container datasets.
+        n_scales: the number of resolution levels of container outputs. With more than one level the output
+            is written as multiscale group, see MultiscaleOutput.
+    """
+    split = split_dataset_path(out_path)
+    if split is not None and n_scales > 1:
+        return MultiscaleOutput(out_path, shape, dtype, axes, chunks=chunks, n_scales=n_scales)
+    elif split is not None:
+        backend, container, key = split
+        dataset = backend.create_dataset(container, key, shape, dtype, chunks)
+        backend.set_axes(dataset, axes)
+        return dataset
+
+    ext = os.path.splitext(out_path)[1]
+    if ext != ".npy":
+        raise ValueError(f"Only .npy files and datasets of {tuple(IO_BACKENDS)} containers can be written to directly")
+    return np.lib.format.open_memmap(out_path, mode="w+", dtype=dtype, shape=tuple(shape))
+
+
+def close_output(out_path, output):
+    """flush an output that was created by open_output for out_path and release its file"""
+    if isinstance(output, MultiscaleOutput):
+        output.close()
+        return
+
+    split = split_dataset_path(out_path)
+    if split is not None:
+        split[0].close_dataset(output)
+    elif hasattr(output, "flush"):
+        output.flush()
+
+
+def _save_tiff(out_path, image: np.ndarray, compression: Optional[str], num_threads: int, **kwargs):
+    # with compression, tifffile compresses the strips of each page in parallel
+    tifffile.imwrite(out_path, image, compression=compression, maxworkers=num_threads, **kwargs)
+
+
+def save_image(
+    out_path,
+    image,
+    multichannel: str = "split",
+    compression: Optional[str] = None,
+    num_threads: Optional[int] = None,
+    n_scales: int = 1,
+):
+    """Save an image with named axes.
+
+    Args:
+        out_path: the path of the image. Images with a batch axis can only be saved to .npy files
+            or datasets in chunked containers (see IO_BACKENDS).
+        image: the image as xarray data.
+        multichannel: how to save images with a number of channels that is not supported by the image format,
+            i.e. other than 1, 3 or 4. 'split' saves each channel to a separate file with the suffix -c<channel>.
+            For tiff files 'imagej' saves all channels to a single ImageJ hyperstack and 'ome' to a single OME-TIFF.
+        compression: the compression of tiff files, e.g. 'zlib', or 'zstd' and 'lzw' (which require imagecodecs).
+            Other formats are saved with their default settings.
+        num_threads: the number of threads that compress a tiff file or save the separate channel files.
+            By default the number of cpus is used.
+        n_scales: the number of resolution levels of outputs in chunked containers. With more than one level
+            the output is saved as multiscale group, see MultiscaleOutput. Other formats only save the image.
+    """
+    if split_dataset_path(out_path) is not None:
+        # datasets in chunked containers are saved with the tensor axes
+        output = open_output(out_path, image.shape, image.dtype, image.dims, n_scales=n_scales)
+        try:
+            output[...] = np.asarray(image)
+        finally:
+            close_output(out_path, output)
+        return
+
+    if multichannel not in ("split", "imagej", "ome"):
+        raise ValueError(f"Invalid multichannel mode {multichannel}, expected one of 'split', 'imagej' or 'ome'")
+    if num_threads is None:
+        num_threads = os.cpu_count() or 1
 
-def save_image(out_path, image):
     ext = os.path.splitext(out_path)[1]
+    if ext not in (".tif", ".tiff"):
+        # the other formats are saved with their default settings
+        multichannel, compression = "split", None
+
     if ext == ".npy":
         np.save(out_path, image)
     else:
@@ -118,19 +631,47 @@ def save_image(out_path, image):
         if "c" in image.dims:  # image formats need channel last
             image = to_channel_last(image)
 
-        save_function = imageio.volsave if is_volume else imageio.imsave
+        if compression is None:
+            save_function = imageio.volsave if is_volume else imageio.imsave
+        else:
+            save_function = functools.partial(_save_tiff, compression=compression, num_threads=num_threads)
         # most image formats only support channel dimensions of 1, 3 or 4;
-        # if not we need to save the channels separately
+        # if not we need to save the channels separately or as a tiff hyperstack
         ndim = 3 if is_volume else 2
         save_as_single_image = image.ndim == ndim or (image.shape[-1] in (3, 4))
 
         if save_as_single_image:
-            save_function(out_path, image)
+            save_function(out_path, image.values)
+        elif multichannel != "split":
+            # hyperstacks store the channels as separate pages in the axis order of imagej
+            axes = ("z", "c", "y", "x") if is_volume else ("c", "y", "x")
+            _save_tiff(
+                out_path,
+                image.transpose(*axes).values,
+                compression,
+                num_threads,
+                metadata={"axes": "".join(axes).upper()},
+                **{multichannel: True},
+            )
         else:
             out_prefix, ext = os.path.splitext(out_path)
-            for c in range(image.shape[-1]):
-                chan_out_path = f"{out_prefix}-c{c}{ext}"
-                save_function(chan_out_path, image[..., c])
+            chan_out_paths = [f"{out_prefix}-c{c}{ext}" for c in range(image.shape[-1])]
+            if num_threads == 1:
+                for c, chan_out_path in enumerate(chan_out_paths):
+                    save_function(chan_out_path, image[..., c].values)
+            else:
+                # the compression threads are shared out to the channels that are saved in parallel
+                if compression is not None:
+                    save_function = functools.partial(
+                        _save_tiff, compression=compression, num_threads=max(1, num_threads // len(chan_out_paths))
+                    )
+                with ThreadPoolExecutor(max_workers=min(num_threads, len(chan_out_paths))) as executor:
+                    futures = [
+                        executor.submit(save_function, chan_out_path, image[..., c].values)
+                        for c, chan_out_path in enumerate(chan_out_paths)
+                    ]
+                    for future in futures:
+                        future.result()
 
 
 #
@@ -178,3 +719,73 @@ def pad(image, axes: Sequence[str], padding, pad_right=True) -> Tuple[np.ndarray
 
     image = np.pad(image, pad_width, mode="symmetric")
     return image, crop
+
+
+def _mirror_index(index: np.ndarray, size: int, mode: str) -> np.ndarray:
+    """map (out of bounds) indices to the indices of an axis of the given size that is mirrored at its borders"""
+    if mode == "symmetric":  # the border value is repeated
+        period = 2 * size
+        index = index % period
+        return np.where(index < size, index, period - 1 - index)
+    elif mode == "reflect":  # the border value is not repeated
+        if size == 1:
+            return np.zeros_like(index)
+        period = 2 * (size - 1)
+        index = index % period
+        return np.where(index < size, index, period - index)
+    else:
+        raise ValueError(f"Unsupported padding mode {mode}")
+
+
+def pad_into(out: np.ndarray, image: np.ndarray, pad_width: Sequence[Sequence[int]], mode: str = "symmetric"):
+    """Pad image into the preallocated array out, which has the padded shape.
+
+    Same result as np.pad for the modes 'symmetric' and 'reflect', but the borders are filled in place by
+    index arithmetic instead of allocating a new padded array.
+    """
+    assert image.ndim == out.ndim == len(pad_width)
+    assert out.shape == tuple(sh + before + after for sh, (before, after) in zip(image.shape, pad_width))
+    if any(max(before, after) >= sh for sh, (before, after) in zip(image.shape, pad_width) if before or after):
+        # np.pad mirrors iteratively for pad widths exceeding the image, which is not simply periodic
+        out[...] = np.pad(image, pad_width, mode=mode)
+        return out
+
+    center = [slice(before, before + sh) for sh, (before, _) in zip(image.shape, pad_width)]
+    out[tuple(center)] = image
+
+    # pad one axis after the other: the preceding axes are already padded, the following ones only hold the center
+    for axis, (sh, (before, after)) in enumerate(zip(image.shape, pad_width)):
+        region = [slice(None)] * axis + center[axis:]
+        borders = [(slice(0, before), np.arange(-before, 0)), (slice(before + sh, None), np.arange(sh, sh + after))]
+        for dest, index in borders:
+            if len(index) == 0:
+                continue
+            src = region.copy()
+            src[axis] = before + _mirror_index(index, sh, mode)
+            region[axis] = dest
+            out[tuple(region)] = out[tuple(src)]
+
+    return out
+
+
+class BufferPool:
+    """Pool of reusable arrays, keyed by shape and dtype, to avoid allocating new arrays for each tile."""
+
+    def __init__(self):
+        self._free: DefaultDict[Tuple[Tuple[int, ...], np.dtype], List[np.ndarray]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def get(self, shape: Sequence[int], dtype) -> np.ndarray:
+        """get an uninitialized array, which is reused if one of the same shape and dtype was released before"""
+        key = (tuple(shape), np.dtype(dtype))
+        with self._lock:
+            if self._free[key]:
+                return self._free[key].pop()
+
+        return np.empty(key[0], dtype=key[1])
+
+    def release(self, *arrays: np.ndarray):
+        """return arrays to the pool; they must not be used by the caller afterwards"""
+        with self._lock:
+            for arr in arrays:
+                self._free[(arr.shape, arr.dtype)].append(arr)
@@ -1,20 +1,57 @@
 import collections
+import contextlib
+import functools
+import logging
+import multiprocessing
 import os
-from itertools import product
+import sys
+import warnings
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field, fields
 from pathlib import Path
-from typing import Dict, Iterator, List, NamedTuple, Optional, OrderedDict, Sequence, Tuple, Union
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    OrderedDict,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 import numpy as np
 import xarray as xr
 from tqdm import tqdm
 
 from bioimageio.core import image_helper
+from bioimageio.core.image_helper import _to_slices
 from bioimageio.core import load_resource_description
 from bioimageio.core.prediction_pipeline import PredictionPipeline, create_prediction_pipeline
+from bioimageio.core.prediction_pipeline._measure_groups import get_subsample_strides
+from bioimageio.core.prediction_pipeline._model_adapters import create_model_adapter
+from bioimageio.core.prediction_pipeline._utils import TensorMeasures
 from bioimageio.core.resource_io.nodes import ImplicitOutputShape, Model, ResourceDescription
 from bioimageio.spec.shared import raw_nodes
 from bioimageio.spec.shared.raw_nodes import ResourceDescription as RawResourceDescription
 
+try:
+    import dask.array as da
+except ImportError:
+    da = None
+
+try:
+    import threadpoolctl
+except ImportError:
+    threadpoolctl = None
+
+logger = logging.getLogger(__name__)
+
 
 def _apply_crop(data, crop):
     crop = tuple(crop[ax] for ax in data.dims)
@@ -27,99 +64,493 @@ class TileDef(NamedTuple):
     local: Dict[str, slice]
 
 
+@dataclass(eq=False)
+class TilingPlan:
+    """Precomputed tiling of the spatial axes of an image, which can be reused for all images of the same shape.
+
+    The bounds are stored as arrays of shape (number of tiles, number of axes, 2) holding start and stop
+    (or the padding before and after) of each tile along each axis.
+    """
+
+    axes: Tuple[str, ...]
+    shape: Tuple[int, ...]
+    tile_shape: Tuple[int, ...]
+    halo: Tuple[int, ...]
+    inner: np.ndarray  # the part of the image that is predicted by a tile
+    outer: np.ndarray  # the inner tile extended by the halo, which is read from the image
+    pad_width: np.ndarray  # padding of the outer tile to the tile shape
+
+    @classmethod
+    def create(cls, shape: Dict[str, int], tile_shape: Dict[str, int], halo: Dict[str, int]) -> "TilingPlan":
+        axes = tuple(shape)
+        shape_ = np.array([shape[ax] for ax in axes])
+        tile_shape_ = np.array([tile_shape[ax] for ax in axes])
+        halo_ = np.array([halo[ax] for ax in axes])
+        inner_tile_shape = tile_shape_ - 2 * halo_
+        if (inner_tile_shape <= 0).any():
+            raise ValueError(f"Tile shape {tile_shape} is too small for halo {halo}")
+
+        n_tiles_per_axis = -(-shape_ // inner_tile_shape)  # ceil division
+        grid = np.stack(np.meshgrid(*[np.arange(n) for n in n_tiles_per_axis], indexing="ij"), axis=-1)
+        start = grid.reshape(-1, len(axes)) * inner_tile_shape
+        inner = np.stack([start, np.minimum(start + inner_tile_shape, shape_)], axis=-1)
+        outer = np.stack([np.maximum(inner[..., 0] - halo_, 0), np.minimum(inner[..., 1] + halo_, shape_)], axis=-1)
+
+        # border tiles that are smaller than the tile shape are padded away from the border:
+        # on the right for the first tile along an axis and on the left otherwise
+        pwidth = tile_shape_ - (outer[..., 1] - outer[..., 0])
+        if (pwidth < 0).any():
+            raise ValueError(f"Tile shape {tile_shape} is smaller than the tiles with halo {halo}")
+        pad_right = outer[..., 0] == 0
+        pad_width = np.stack([np.where(pad_right, 0, pwidth), np.where(pad_right, pwidth, 0)], axis=-1)
+
+        return cls(
+            axes=axes,
+            shape=tuple(shape_.tolist()),
+            tile_shape=tuple(tile_shape_.tolist()),
+            halo=tuple(halo_.tolist()),
+            inner=inner,
+            outer=outer,
+            pad_width=pad_width,
+        )
+
+    def __len__(self):
+        return len(self.inner)
+
+    @property
+    def local(self) -> np.ndarray:
+        """the inner tiles relative to the outer tiles"""
+        return self.inner - self.outer[..., :1]
+
+    @property
+    def padded_start(self) -> np.ndarray:
+        """start of the padded outer tiles in the image, which is negative if the padding is on the left"""
+        return self.outer[..., 0] - self.pad_width[..., 0]
+
+    def get_output_tiles(
+        self, output_axes: Sequence[str], output_shape: Sequence[int], scale: Dict[str, float], offset: Dict[str, float]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """map the inner tiles to an output that is rescaled with respect to the tiled image
+
+        Returns:
+            the inner tiles in the output and the inner tiles relative to the outputs of the padded tiles,
+            with bounds for all output axes; untiled axes are covered completely.
+        """
+        inner = np.zeros((len(self), len(output_axes), 2), dtype=int)
+        local = np.zeros_like(inner)
+        for i, (ax, size) in enumerate(zip(output_axes, output_shape)):
+            if ax not in self.axes or not scale[ax]:
+                inner[:, i] = local[:, i] = (0, size)
+                continue
+
+            # the border tiles extend to the border of the output
+            k = self.axes.index(ax)
+            start, stop = self.inner[:, k, 0], self.inner[:, k, 1]
+            start = np.where(start == 0, 0, np.round(scale[ax] * start + offset[ax]).astype(int))
+            stop = np.where(stop == self.shape[k], size, np.round(scale[ax] * stop + offset[ax]).astype(int))
+            local_start = start - np.round(scale[ax] * self.padded_start[:, k]).astype(int)
+            local_stop = local_start + stop - start
+            tile_size = int(scale[ax] * self.tile_shape[k] + 2 * offset[ax])
+            if (local_start < 0).any() or (local_stop > tile_size).any():
+                raise ValueError(f"The tiling halo along axis {ax} is too small for the output offset {offset[ax]}")
+
+            inner[:, i] = np.stack([start, stop], axis=-1)
+            local[:, i] = np.stack([local_start, local_stop], axis=-1)
+
+        return inner, local
+
+    def to_dict(self) -> Dict[str, Any]:
+        """serialize the plan to a json compatible dict"""
+        ret = {}
+        for field in fields(self):
+            value = getattr(self, field.name)
+            ret[field.name] = value.tolist() if isinstance(value, np.ndarray) else list(value)
+
+        return ret
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TilingPlan":
+        return cls(
+            axes=tuple(data["axes"]),
+            shape=tuple(data["shape"]),
+            tile_shape=tuple(data["tile_shape"]),
+            halo=tuple(data["halo"]),
+            inner=np.array(data["inner"], dtype=int).reshape(-1, len(data["axes"]), 2),
+            outer=np.array(data["outer"], dtype=int).reshape(-1, len(data["axes"]), 2),
+            pad_width=np.array(data["pad_width"], dtype=int).reshape(-1, len(data["axes"]), 2),
+        )
+
+
+@functools.lru_cache(maxsize=16)
+def _get_tiling_plan(
+    shape: Tuple[Tuple[str, int], ...], tile_shape: Tuple[Tuple[str, int], ...], halo: Tuple[Tuple[str, int], ...]
+) -> TilingPlan:
+    return TilingPlan.create(dict(shape), dict(tile_shape), dict(halo))
+
+
 def get_tiling(
     shape: Sequence[int], tile_shape: Dict[str, int], halo: Dict[str, int], input_axes: Sequence[str]
 ) -> Iterator[TileDef]:
     assert len(shape) == len(input_axes)
+    spatial_shape = {ax: sh for ax, sh in zip(input_axes, shape) if ax in "xyz"}
+    plan = TilingPlan.create(spatial_shape, tile_shape, halo)
 
-    shape_ = [sh for sh, ax in zip(shape, input_axes) if ax in "xyz"]
-    spatial_axes = [ax for ax in input_axes if ax in "xyz"]
-    inner_tile_shape_ = [tile_shape[ax] - 2 * halo[ax] for ax in spatial_axes]
-    halo_ = [halo[ax] for ax in spatial_axes]
-    assert len(shape_) == len(inner_tile_shape_) == len(spatial_axes) == len(halo_)
+    for outer, inner, local in zip(plan.outer.tolist(), plan.inner.tolist(), plan.local.tolist()):
+        outer_tile = {ax: slice(*o) for ax, o in zip(plan.axes, outer)}
+        inner_tile = {ax: slice(*i) for ax, i in zip(plan.axes, inner)}
+        local_tile = {ax: slice(lo[0], lo[1] - (o[1] - o[0]) or None) for ax, o, lo in zip(plan.axes, outer, local)}
+        for tile in (outer_tile, inner_tile, local_tile):
+            tile["b"] = slice(None)
+            tile["c"] = slice(None)
 
-    ranges = [range(sh // tsh if sh % tsh == 0 else sh // tsh + 1) for sh, tsh in zip(shape_, inner_tile_shape_)]
-    start_points = product(*ranges)
+        yield TileDef(outer_tile, inner_tile, local_tile)
 
-    for start_point in start_points:
-        positions = [sp * tsh for sp, tsh in zip(start_point, inner_tile_shape_)]
 
-        inner_tile = {
-            ax: slice(pos, min(pos + tsh, sh))
-            for ax, pos, tsh, sh in zip(spatial_axes, positions, inner_tile_shape_, shape_)
-        }
-        inner_tile["b"] = slice(None)
-        inner_tile["c"] = slice(None)
+# called with the outer tiles of all inputs (before padding), the inner tile and the shape of the tiled image;
+# returns whether the tile should be predicted
+TilePredicate = Callable[[Sequence[np.ndarray], Dict[str, slice], Dict[str, int]], bool]
 
-        outer_tile = {
-            ax: slice(max(pos - ha, 0), min(pos + tsh + ha, sh))
-            for ax, pos, tsh, sh, ha in zip(spatial_axes, positions, inner_tile_shape_, shape_, halo_)
-        }
-        outer_tile["b"] = slice(None)
-        outer_tile["c"] = slice(None)
 
-        local_tile = {
-            ax: slice(
-                inner_tile[ax].start - outer_tile[ax].start,
-                -(outer_tile[ax].stop - inner_tile[ax].stop) if outer_tile[ax].stop != inner_tile[ax].stop else None,
-            )
-            for ax in spatial_axes
-        }
-        local_tile["b"] = slice(None)
-        local_tile["c"] = slice(None)
+@dataclass
+class IntensityThreshold:
+    """tile predicate to only predict tiles of which the maximum intensity of an input exceeds the threshold"""
 
-        yield TileDef(outer_tile, inner_tile, local_tile)
+    threshold: float
+    input_index: int = 0
+
+    def __call__(self, inputs: Sequence[np.ndarray], tile: Dict[str, slice], shape: Dict[str, int]) -> bool:
+        return bool(np.max(inputs[self.input_index]) > self.threshold)
+
+
+@dataclass
+class ForegroundMask:
+    """tile predicate to only predict tiles that overlap the foreground of a (low resolution) mask
+
+    The mask is given for the spatial axes of the tiled image and is scaled to the image shape.
+    """
+
+    mask: xr.DataArray
+
+    def __call__(self, inputs: Sequence[np.ndarray], tile: Dict[str, slice], shape: Dict[str, int]) -> bool:
+        region = {}
+        for ax, mask_size in self.mask.sizes.items():
+            scale = mask_size / shape[ax]
+            region[ax] = slice(int(np.floor(tile[ax].start * scale)), int(np.ceil(tile[ax].stop * scale)))
+        return bool(self.mask[region].any())
+
+
+@dataclass
+class TileStats:
+    """Counts of the predicted tiles and the tiles that were skipped by the tile predicate of predict_with_tiling,
+    i.e. the tiles of the outputs that hold the skip_fill_value instead of the model output.
+
+    Pass it as tile_stats to predict_with_tiling and inspect the counts afterwards; they accumulate over calls.
+    """
+
+    predicted: int = 0
+    skipped: int = 0
+
+    @property
+    def skipped_fraction(self) -> float:
+        """the fraction of tiles that were skipped"""
+        total = self.predicted + self.skipped
+        return self.skipped / total if total else 0.0
+
+
+def _is_valid_batch_size(input_spec, batch_size: int) -> bool:
+    """check whether the model accepts the given size of the batch axis for this input"""
+    axes = input_spec.axes
+    if "b" not in axes:
+        return batch_size == 1
+
+    b_index = axes.index("b")
+    shape = input_spec.shape
+    if isinstance(shape, list):  # fixed shape
+        return batch_size == shape[b_index]
+
+    min_b, step_b = shape.min[b_index], shape.step[b_index]
+    if step_b == 0:
+        return batch_size == min_b
+    return batch_size >= min_b and (batch_size - min_b) % step_b == 0
+
+
+class _LazyTensor:
+    """Named axes for any array that supports slicing via __getitem__/__setitem__ and has a shape,
+    e.g. a numpy memmap, a zarr array or an h5py dataset. Only the indexed regions are read or written.
+    """
+
+    __slots__ = ("data", "dims", "shape", "sizes")
+
+    def __init__(self, data, dims: Sequence[str]):
+        if len(data.shape) != len(dims):
+            raise ValueError(f"Number of axes {dims} does not match the array shape {data.shape}")
+        self.data = data
+        self.dims = tuple(dims)
+        self.shape = tuple(data.shape)
+        self.sizes = dict(zip(self.dims, self.shape))
+
+    @classmethod
+    def wrap(cls, data, dims: Sequence[str]) -> "_LazyTensor":
+        if isinstance(data, xr.DataArray):
+            return cls(data.transpose(*dims).data, dims)
+        return cls(data, dims)
+
+
+def _get_output_scale_offset(output_spec) -> Tuple[Dict[str, float], Dict[str, float]]:
+    """get scale and offset of the output relative to its reference input; fixed output shapes are not rescaled"""
+    if isinstance(output_spec.shape, ImplicitOutputShape):
+        scale = dict(zip(output_spec.axes, output_spec.shape.scale))
+        offset = dict(zip(output_spec.axes, output_spec.shape.offset))
+    else:
+        scale = {ax: 1 for ax in output_spec.axes}
+        offset = {ax: 0 for ax in output_spec.axes}
+    return scale, offset
+
+
+def _map_to_input_halo(halo: int, scale: float, offset: float) -> int:
+    """map a halo in the output space to the halo in the input space, which also has to compensate the offset"""
+    return int(np.ceil((halo - offset) / scale))
+
+
+def _get_output_chunks(plan: TilingPlan, output_spec, output_shape: Sequence[int]) -> Tuple[int, ...]:
+    """chunk the output like the inner tiles, so that each tile writes complete chunks"""
+    scale, _ = _get_output_scale_offset(output_spec)
+    inner_tile_shape = {ax: tsh - 2 * h for ax, tsh, h in zip(plan.axes, plan.tile_shape, plan.halo)}
+    chunks = []
+    for ax, size in zip(output_spec.axes, output_shape):
+        if ax in inner_tile_shape and scale[ax]:
+            size = min(size, max(1, int(round(scale[ax] * inner_tile_shape[ax]))))
+        chunks.append(size)
+    return tuple(chunks)
+
+
+def _prefetch(executor: Executor, func: Callable, items: Iterable, depth: int) -> Iterator:
+    """apply func to items in the executor and yield the results in order, computing up to depth results ahead"""
+    pending: Deque[Future] = collections.deque()
+    try:
+        for item in items:
+            pending.append(executor.submit(func, item))
+            if len(pending) > depth:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def _compute_image_measures(
+    prediction_pipeline: PredictionPipeline, inputs: Sequence[_LazyTensor], max_size: Optional[int] = None
+) -> TensorMeasures:
+    """compute the per-sample measures of the preprocessing once for the full inputs
+
+    Args:
+        prediction_pipeline: the prediction pipeline for the input model.
+        inputs: the (lazy) inputs of the model.
+        max_size: if given, the inputs are subsampled with a regular stride along the spatial axes,
+            so that at most about max_size elements are read per input (like the 'strided' subsample of the
+            sample statistics, see create_prediction_pipeline).
+    """
+    input_data = []
+    for ipt in inputs:
+        strides = {} if max_size is None else get_subsample_strides(ipt.sizes, ("z", "y", "x"), max_size)
+        key = tuple(slice(None, None, strides.get(ax)) for ax in ipt.dims)
+        input_data.append(xr.DataArray(np.asarray(ipt.data[key]), dims=ipt.dims))
+
+    sample_measures = prediction_pipeline.compute_sample_measures(*input_data)
+    # the measures are computed for a batch of size 1, drop its batch axis so that they apply to batches of tiles
+    return {
+        name: {
+            measure: value.squeeze("b", drop=True)
+            if isinstance(value, xr.DataArray) and value.sizes.get("b") == 1
+            else value
+            for measure, value in measures.items()
+        }
+        for name, measures in sample_measures.items()
+    }
 
 
 def _predict_with_tiling_impl(
     prediction_pipeline: PredictionPipeline,
-    inputs: Sequence[xr.DataArray],
-    outputs: Sequence[xr.DataArray],
-    tile_shapes: Sequence[Dict[str, int]],
-    halos: Sequence[Dict[str, int]],
+    inputs: Sequence[_LazyTensor],
+    outputs: Sequence[_LazyTensor],
+    plan: TilingPlan,
     verbose: bool = False,
-):
-    if len(inputs) > 1:
-        raise NotImplementedError("Tiling with multiple inputs not implemented yet")
+    tile_batch_size: int = 1,
+    prefetch: int = 0,
+    tile_predicate: Optional[TilePredicate] = None,
+    skip_fill_value: float = 0,
+    sample_measures: Optional[TensorMeasures] = None,
+) -> int:
+    """predict all tiles of the plan and return the number of tiles that were skipped by the tile predicate
+
+    If sample_measures are given, they are used for the per-sample preprocessing of all tiles
+    instead of computing them for each tile.
+    """
+    assert len(inputs) == len(prediction_pipeline.input_specs)
+    assert len(outputs) == len(prediction_pipeline.output_specs)
+    assert tile_batch_size > 0
+    assert prefetch >= 0
+
+    # all inputs are tiled with the same spatial grid
+    for ipt in inputs:
+        for ax, sh in zip(ipt.dims, ipt.shape):
+            if ax in plan.axes and plan.shape[plan.axes.index(ax)] != sh:
+                raise ValueError(f"Input shape {ipt.sizes} does not match the tiling plan for shape {plan.shape}")
+
+    # the tiles of one batch are concatenated along the batch axis, so each tile contributes
+    # the batch size of the input; fall back to predicting tile by tile if the model does not
+    # support the resulting batch size (e.g. models with a fixed batch size of 1) or if the
+    # outputs can't be split into the tiles again, because they have no batch axis
+    def is_valid_batch(n_tiles):
+        if n_tiles > 1 and not all("b" in spec.axes for spec in prediction_pipeline.output_specs):
+            return False
+
+        return all(
+            _is_valid_batch_size(spec, n_tiles * ipt.sizes.get("b", 1))
+            for ipt, spec in zip(inputs, prediction_pipeline.input_specs)
+        )
 
-    if len(outputs) > 1:
-        raise NotImplementedError("Tiling with multiple outputs not implemented yet")
+    if tile_batch_size > 1 and not is_valid_batch(tile_batch_size):
+        warnings.warn(
+            f"Model does not support a batch of {tile_batch_size} tiles, predicting tiles one by one instead."
+        )
+        tile_batch_size = 1
+
+    # convert the plan to python lists once, so that the tile loop only needs to index
+    outer = plan.outer.tolist()
+    inner = plan.inner.tolist()
+    image_shape = dict(zip(plan.axes, plan.shape))
+    n_skipped = 0
+    pad_width = plan.pad_width.tolist()
+    input_axes = [[plan.axes.index(ax) if ax in plan.axes else None for ax in ipt.dims] for ipt in inputs]
+    output_tiles = []
+    for output, spec in zip(outputs, prediction_pipeline.output_specs):
+        scale, offset = _get_output_scale_offset(spec)
+        out_inner, out_local = plan.get_output_tiles(output.dims, output.shape, scale, offset)
+        output_tiles.append((out_inner.tolist(), out_local.tolist()))
+
+    # padded tiles and tile batches are assembled in reusable buffers instead of allocating new arrays for each tile
+    buffers = image_helper.BufferPool()
+
+    def load_tile(i: int):
+        tile_inputs = []
+        tile_buffers = []
+        for ipt, axes in zip(inputs, input_axes):
+            key = tuple(slice(None) if k is None else slice(*outer[i][k]) for k in axes)
+            tile_inputs.append(np.asarray(ipt.data[key]))
+
+        if tile_predicate is not None:
+            inner_tile = {ax: slice(*bounds) for ax, bounds in zip(plan.axes, inner[i])}
+            if not tile_predicate(tile_inputs, inner_tile, image_shape):
+                return i, None, tile_buffers
+
+        # we need to use padded prediction for the individual tiles in case the
+        # border tiles don't match the requested tile shape
+        for j, axes in enumerate(input_axes):
+            pwidth = [(0, 0) if k is None else pad_width[i][k] for k in axes]
+            if any(p for pw in pwidth for p in pw):
+                tile = tile_inputs[j]
+                padded_shape = [sh + before + after for sh, (before, after) in zip(tile.shape, pwidth)]
+                tile_inputs[j] = image_helper.pad_into(buffers.get(padded_shape, tile.dtype), tile, pwidth)
+                tile_buffers.append(tile_inputs[j])
+
+        return i, tile_inputs, tile_buffers
+
+    def predict_batch(batch):
+        batch_inputs = []
+        batch_buffers = [buf for _, _, tile_buffers in batch for buf in tile_buffers]
+        for j, ipt in enumerate(inputs):
+            tile_inputs = [tile_inputs[j] for _, tile_inputs, _ in batch]
+            if len(tile_inputs) == 1:
+                batch_inputs.append(tile_inputs[0])
+            else:
+                assert "b" in ipt.dims
+                b_index = ipt.dims.index("b")
+                batch_shape = list(tile_inputs[0].shape)
+                batch_shape[b_index] = sum(t.shape[b_index] for t in tile_inputs)
+                batch_input = buffers.get(batch_shape, np.result_type(*tile_inputs))
+                batch_inputs.append(np.concatenate(tile_inputs, axis=b_index, out=batch_input))
+                batch_buffers.append(batch_input)
+
+        batch_outputs = predict(prediction_pipeline, batch_inputs, sample_measures=sample_measures)
+        assert len(batch_outputs) == len(outputs)
+        batch_outputs = [
+            out.values if out.dims == output.dims else out.transpose(*output.dims).values
+            for out, output in zip(batch_outputs, outputs)
+        ]
+        # outputs may share memory with the inputs (e.g. for pipelines without a copying postprocessing);
+        # these are copied, because the buffers are reused for the next tiles while the tiles may still be
+        # written in the background
+        batch_outputs = [
+            out.copy() if any(np.may_share_memory(out, buf) for buf in batch_buffers) else out for out in batch_outputs
+        ]
+        buffers.release(*batch_buffers)
+        for out, output, (out_inner, out_local) in zip(batch_outputs, outputs, output_tiles):
+            if "b" in output.dims:
+                b_index = output.dims.index("b")
+                out_batch = np.split(out, len(batch), axis=b_index)
+            else:
+                out_batch = [out]
+
+            for out_i, (i, _, _) in zip(out_batch, batch):
+                write_tile(output, _to_slices(out_inner[i]), out_i[_to_slices(out_local[i])])
+
+    def run(loaded_tiles):
+        nonlocal n_skipped
+        batch = []
+        for loaded_tile in loaded_tiles:
+            i, tile_inputs, _ = loaded_tile
+            if tile_inputs is None:  # the tile was rejected by the tile predicate
+                for output, (out_inner, _) in zip(outputs, output_tiles):
+                    write_tile(output, _to_slices(out_inner[i]), skip_fill_value)
+                n_skipped += 1
+                if verbose:
+                    tiles.set_postfix(skipped=n_skipped)
+                continue
+
+            batch.append(loaded_tile)
+            if len(batch) == tile_batch_size:
+                predict_batch(batch)
+                batch = []
+
+        if batch:
+            if is_valid_batch(len(batch)):
+                predict_batch(batch)
+            else:  # the last, incomplete batch is not supported by the model
+                for tile in batch:
+                    predict_batch([tile])
+
+    tiles = range(len(plan))
+    if verbose:
+        tiles = tqdm(tiles, desc="prediction with tiling")
 
-    assert len(tile_shapes) == len(outputs)
-    assert len(halos) == len(outputs)
+    if prefetch == 0:
 
-    input_ = inputs[0]
-    output = outputs[0]
-    tile_shape = tile_shapes[0]
-    halo = halos[0]
+        def write_tile(output, tile, data):
+            output.data[tile] = data
 
-    tiles = get_tiling(shape=input_.shape, tile_shape=tile_shape, halo=halo, input_axes=input_.dims)
+        run(load_tile(i) for i in tiles)
+    else:
+        # read and pad the upcoming tiles in one background thread and write the finished tiles in another one,
+        # so that I/O overlaps with the model computation; at most `prefetch` tiles are in flight on each side
+        with ThreadPoolExecutor(max_workers=1) as reader, ThreadPoolExecutor(max_workers=1) as writer:
+            pending_writes: Deque[Future] = collections.deque()
 
-    assert all(isinstance(ax, str) for ax in input_.dims)
-    input_axes: Tuple[str, ...] = input_.dims  # noqa
+            def write_tile(output, tile, data):
+                pending_writes.append(writer.submit(output.data.__setitem__, tile, data))
+                while len(pending_writes) > prefetch:
+                    pending_writes.popleft().result()
 
-    def load_tile(tile):
-        inp = input_[tile]
-        # whether to pad on the right or left of the dim for the spatial dims
-        # + placeholders for batch and axis dimension, where we don't pad
-        pad_right = [tile[ax].start == 0 if ax in "xyz" else None for ax in input_axes]
-        return inp, pad_right
+            try:
+                run(_prefetch(reader, load_tile, tiles, prefetch))
+            finally:
+                # wait for all writes to finish (and raise their errors) before returning
+                while pending_writes:
+                    pending_writes.popleft().result()
 
-    if verbose:
-        shape = {ax: sh for ax, sh in zip(prediction_pipeline.input_specs[0].axes, input_.shape)}
-        n_tiles = int(np.prod([np.ceil(float(shape[ax]) / (tsh - 2 * halo[ax])) for ax, tsh in tile_shape.items()]))
-        tiles = tqdm(tiles, total=n_tiles, desc="prediction with tiling")
-
-    # we need to use padded prediction for the individual tiles in case the
-    # border tiles don't match the requested tile shape
-    padding = {ax: tile_shape[ax] for ax in input_axes if ax in "xyz"}
-    padding["mode"] = "fixed"
-    for outer_tile, inner_tile, local_tile in tiles:
-        inp, pad_right = load_tile(outer_tile)
-        out = predict_with_padding(prediction_pipeline, inp, padding, pad_right)
-        assert len(out) == 1
-        out = out[0]
-        output[inner_tile] = out[local_tile]
+    return n_skipped
 
 
 #
@@ -132,12 +563,15 @@ def predict(
     inputs: Union[
         xr.DataArray, List[xr.DataArray], Tuple[xr.DataArray], np.ndarray, List[np.ndarray], Tuple[np.ndarray]
     ],
+    sample_measures: Optional[TensorMeasures] = None,
 ) -> List[xr.DataArray]:
     """Run prediction for a single set of input(s) with a bioimage.io model
 
     Args:
         prediction_pipeline: the prediction pipeline for the input model.
         inputs: the input(s) for this model represented as xarray data or numpy nd array.
+        sample_measures: optional per-sample measures to use for the preprocessing instead of computing them
+            from the inputs, e.g. the measures of the full image when predicting one of its tiles.
     """
     if not isinstance(inputs, (tuple, list)):
         inputs = [inputs]
@@ -147,7 +581,10 @@ def predict(
         ipt if isinstance(ipt, xr.DataArray) else xr.DataArray(ipt, dims=ipt_spec.axes)
         for ipt, ipt_spec in zip(inputs, prediction_pipeline.input_specs)
     ]
-    return prediction_pipeline.forward(*tagged_data)
+    if not sample_measures:  # pipelines that do not compute sample measures may not accept them
+        return prediction_pipeline.forward(*tagged_data)
+
+    return prediction_pipeline.forward(*tagged_data, sample_measures=sample_measures)
 
 
 def _parse_padding(padding, input_specs):
@@ -183,10 +620,112 @@ def _parse_padding(padding, input_specs):
     return padding
 
 
+def _next_valid_size(input_spec, ax: str, size: int) -> int:
+    """the smallest size along the axis that is valid for the input and not smaller than size"""
+    i = input_spec.axes.index(ax)
+    if isinstance(input_spec.shape, list):
+        valid = input_spec.shape[i]
+    else:
+        min_ax, step_ax = input_spec.shape.min[i], input_spec.shape.step[i]
+        valid = min_ax if step_ax == 0 or size <= min_ax else min_ax + -(-(size - min_ax) // step_ax) * step_ax
+
+    if valid < size:
+        raise ValueError(f"Size {size} along axis {ax} exceeds the fixed input size {valid} of the model")
+    return valid
+
+
+@dataclass
+class ShapeBuckets:
+    """Bucketing policy for padding inputs of models with parametrized input shapes.
+
+    Every distinct input shape can trigger new kernel selection and allocations in the deep learning frameworks.
+    Instead of padding to the smallest valid shape, inputs are padded to the smallest of a few canonical sizes
+    per spatial axis, so that the model only sees a small set of shapes. Inputs that are larger than all sizes
+    along an axis are padded to the smallest valid size along that axis and counted as misses.
+
+    Pass it as padding to predict_with_padding (or predict_image(s) / predict_stream) and inspect the bucket counts
+    with hit_rate and summary afterwards.
+
+    Args:
+        sizes: the canonical sizes per spatial axis, which need to be valid sizes for the model input.
+    """
+
+    sizes: Dict[str, Sequence[int]]
+    counts: Dict[Tuple[Tuple[str, int], ...], int] = field(default_factory=dict)
+    misses: int = 0
+
+    @classmethod
+    def from_spec(cls, input_spec, max_size: Dict[str, int], factor: float = 2) -> "ShapeBuckets":
+        """create buckets of geometrically growing sizes, from the minimal valid size up to max_size per axis"""
+        sizes = {}
+        for ax, max_sh in max_size.items():
+            size = _next_valid_size(input_spec, ax, 1)
+            sizes[ax] = [size]
+            while size < max_sh:
+                size = _next_valid_size(input_spec, ax, max(size + 1, int(np.ceil(size * factor))))
+                sizes[ax].append(size)
+
+        return cls(sizes)
+
+    def get_padding(self, input_spec, shape: Dict[str, int]) -> Dict[str, Union[int, str]]:
+        """get the (fixed) padding of an input with the given shape and count its bucket once per sample,
+        i.e. a batch of samples counts with its batch size"""
+        for ax, sizes in self.sizes.items():
+            invalid = [sh for sh in sizes if _next_valid_size(input_spec, ax, sh) != sh]
+            if invalid:
+                raise ValueError(f"Bucket sizes {invalid} along axis {ax} are not valid for the model input")
+
+        padding: Dict[str, Union[int, str]] = {"mode": "fixed"}
+        hit = True
+        for ax, size in shape.items():
+            if ax not in "xyz":
+                continue
+
+            fitting = [sh for sh in self.sizes.get(ax, ()) if sh >= size]
+            if fitting:
+                padding[ax] = min(fitting)
+            else:
+                padding[ax] = _next_valid_size(input_spec, ax, size)
+                hit = False
+
+        n_samples = shape.get("b", 1)
+        if hit:
+            bucket = tuple((ax, sh) for ax, sh in padding.items() if ax != "mode")
+            self.counts[bucket] = self.counts.get(bucket, 0) + n_samples
+        else:
+            self.misses += n_samples
+
+        return padding
+
+    def merge(self, other: "ShapeBuckets"):
+        """add the counts of other, e.g. of the copy of the buckets in a worker process of predict_images"""
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.misses += other.misses
+
+    @property
+    def hit_rate(self) -> float:
+        """the fraction of samples that were padded to one of the buckets"""
+        n_hits = sum(self.counts.values())
+        total = n_hits + self.misses
+        return n_hits / total if total else 0.0
+
+    def summary(self) -> str:
+        """the number and fraction of samples per bucket"""
+        total = sum(self.counts.values()) + self.misses
+        lines = [f"hit rate: {self.hit_rate:.1%} of {total} samples"]
+        for bucket, count in sorted(self.counts.items()):
+            shape = ", ".join(f"{ax}={sh}" for ax, sh in bucket)
+            lines.append(f"  {shape}: {count} ({count / total:.1%})")
+        if self.misses:
+            lines.append(f"  no bucket: {self.misses} ({self.misses / total:.1%})")
+        return "\n".join(lines)
+
+
 def predict_with_padding(
     prediction_pipeline: PredictionPipeline,
     inputs: Union[xr.DataArray, List[xr.DataArray], Tuple[xr.DataArray]],
-    padding: Union[bool, Dict[str, int]] = True,
+    padding: Union[bool, Dict[str, int], ShapeBuckets] = True,
     pad_right: bool = True,
 ) -> List[xr.DataArray]:
     """Run prediction with padding for a single set of input(s) with a bioimage.io model.
@@ -194,7 +733,8 @@ def predict_with_padding(
     Args:
         prediction_pipeline: the prediction pipeline for the input model.
         inputs: the input(s) for this model represented as xarray data.
-        padding: the padding settings. Pass True to derive from the model spec.
+        padding: the padding settings. Pass True to derive from the model spec
+            or ShapeBuckets to pad to a small set of canonical shapes.
         pad_right: whether to applying padding to the right or left of the input.
     """
     if not padding:
@@ -211,9 +751,15 @@ def predict_with_padding(
     else:
         network_resizes = False
 
-    padding = _parse_padding(padding, prediction_pipeline.input_specs)
     if not isinstance(inputs, (tuple, list)):
         inputs = [inputs]
+    if isinstance(padding, ShapeBuckets):
+        if len(inputs) > 1:
+            raise NotImplementedError("Padding for multiple inputs not yet implemented")
+        input_spec = prediction_pipeline.input_specs[0]
+        padding = padding.get_padding(input_spec, dict(zip(input_spec.axes, inputs[0].shape)))
+    else:
+        padding = _parse_padding(padding, prediction_pipeline.input_specs)
     if not isinstance(padding, (tuple, list)):
         padding = [padding]
     assert len(padding) == len(prediction_pipeline.input_specs)
@@ -256,18 +802,14 @@ def _determine_shape(min_shape, step, axes):
 def _parse_tiling(tiling, input_specs, output_specs):
     if tiling is None:  # no tiling
         return tiling
-    if len(input_specs) > 1:
-        raise NotImplementedError("Tiling for multiple inputs not yet implemented")
-    if len(output_specs) > 1:
-        raise NotImplementedError("Tiling for multiple outputs not yet implemented")
 
-    input_spec = input_specs[0]
-    output_spec = output_specs[0]
-    axes = input_spec.axes
+    # all inputs share one spatial grid, so the tiling is given for the union of their spatial axes
+    spatial_axes = []
+    for input_spec in input_specs:
+        spatial_axes.extend(ax for ax in input_spec.axes if ax in "xyz" and ax not in spatial_axes)
 
     def check_tiling(tiling):
         assert "halo" in tiling and "tile" in tiling
-        spatial_axes = [ax for ax in axes if ax in "xyz"]
         halo = tiling["halo"]
         tile = tiling["tile"]
         assert all(halo.get(ax, 0) >= 0 for ax in spatial_axes)
@@ -277,26 +819,32 @@ def _parse_tiling(tiling, input_specs, output_specs):
         check_tiling(tiling)
     elif isinstance(tiling, bool):
         if tiling:
-            # NOTE we assume here that shape in input and output are the same
-            # for different input and output shapes, we should actually tile in the
-            # output space and then request the corresponding input tiles
-            # so we would need to apply the output scale and offset to the
-            # input shape to compute the tile size and halo here
-            shape = input_spec.shape
-            if not isinstance(shape, list):
-                shape = _determine_shape(shape.min, shape.step, axes)
-            assert isinstance(shape, list)
-            assert len(shape) == len(axes)
-
-            halo = output_spec.halo
-            if halo is None:
-                halo = [0] * len(axes)
-            assert len(halo) == len(axes)
-
-            tiling = {
-                "halo": {ax: ha for ax, ha in zip(axes, halo) if ax in "xyz"},
-                "tile": {ax: sh for ax, sh in zip(axes, shape) if ax in "xyz"},
-            }
+            # NOTE we tile in the (shared) input space; outputs that are rescaled with respect
+            # to their reference input are mapped to the output space when writing the tiles,
+            # so the halo of the outputs needs to be converted to the input space here
+            tile = {}
+            for input_spec in input_specs:
+                axes = input_spec.axes
+                shape = input_spec.shape
+                if not isinstance(shape, list):
+                    shape = _determine_shape(shape.min, shape.step, axes)
+                assert isinstance(shape, list)
+                assert len(shape) == len(axes)
+                for ax, sh in zip(axes, shape):
+                    if ax in "xyz" and tile.setdefault(ax, sh) != sh:
+                        raise NotImplementedError("Tiling for inputs with different tile shapes is not yet supported")
+
+            # use the largest halo (in input space) of all outputs
+            halo = {ax: 0 for ax in spatial_axes}
+            for output_spec in output_specs:
+                out_halo = output_spec.halo or [0] * len(output_spec.axes)
+                assert len(out_halo) == len(output_spec.axes)
+                scale, offset = _get_output_scale_offset(output_spec)
+                for ax, ha in zip(output_spec.axes, out_halo):
+                    if ax in halo and scale[ax]:
+                        halo[ax] = max(halo[ax], _map_to_input_halo(ha, scale[ax], offset[ax]))
+
+            tiling = {"halo": halo, "tile": tile}
             check_tiling(tiling)
         else:
             tiling = None
@@ -308,81 +856,338 @@ def _parse_tiling(tiling, input_specs, output_specs):
 def predict_with_tiling(
     prediction_pipeline: PredictionPipeline,
     inputs: Union[xr.DataArray, List[xr.DataArray], Tuple[xr.DataArray]],
-    tiling: Union[bool, Dict[str, Dict[str, int]]] = True,
+    tiling: Union[bool, Dict[str, Dict[str, int]], TilingPlan] = True,
     verbose: bool = False,
+    tile_batch_size: int = 1,
+    prefetch: int = 0,
+    outputs: Optional[Sequence[Any]] = None,
+    tile_predicate: Optional[TilePredicate] = None,
+    skip_fill_value: float = 0,
+    n_scales: int = 1,
+    image_measures: bool = False,
+    image_measures_size: Optional[int] = None,
+    tile_stats: Optional[TileStats] = None,
 ) -> List[xr.DataArray]:
     """Run prediction with tiling for a single set of input(s) with a bioimage.io model.
 
     Args:
         prediction_pipeline: the prediction pipeline for the input model.
-        inputs: the input(s) for this model represented as xarray data.
+        inputs: the input(s) for this model represented as xarray data, numpy arrays or lazily indexable arrays
+            (e.g. numpy memmaps, zarr arrays or h5py datasets), which are read tile by tile.
         tiling: the tiling settings. Pass True to derive from the model spec.
+            The tile shape and halo are given in the space of the inputs; outputs that are rescaled
+            with respect to their reference input are stitched in their own space.
+            A precomputed TilingPlan can be passed to reuse it for inputs of the same shape.
         verbose: whether to print the prediction progress.
+        tile_batch_size: the number of tiles that are stacked along the batch axis and predicted together.
+            Falls back to predicting individual tiles if the model does not support this batch size.
+        prefetch: the number of tiles that are read ahead and written back in background threads,
+            to overlap reading and writing the data with the prediction. 0 reads and writes in the main thread.
+        outputs: optional arrays with the axes of the output specs to write the prediction to, tile by tile.
+            These may also be lazily indexable arrays and are returned after prediction.
+            A path to a .npy file or to a dataset in a chunked container (e.g. file.zarr/raw or file.h5:/volume)
+            creates it and writes the tiles to it directly; datasets are chunked like the tiles and returned as is.
+            By default (or for None entries) the outputs are allocated in memory.
+        tile_predicate: optional function to decide whether a tile is predicted, e.g. to skip empty background
+            tiles; see IntensityThreshold and ForegroundMask. It is called with the outer tiles of the inputs,
+            the inner tile and the shape of the tiled image.
+        skip_fill_value: the value of the outputs for the tiles that are skipped by the tile predicate.
+        n_scales: the number of resolution levels of outputs that are created in chunked containers.
+            With more than one level, the downsampled levels are written along with the tiles,
+            see image_helper.MultiscaleOutput.
+        image_measures: whether to compute the per-sample measures of the preprocessing (e.g. the percentiles
+            of scale_range or mean and std of zero_mean_unit_variance) once for the full inputs instead of
+            for each tile. This normalizes all tiles consistently and avoids recomputing the measures per tile.
+            Per-sample measures of the postprocessing are still computed per tile.
+        image_measures_size: if given, the image measures are estimated from a regular subsample of the inputs
+            with at most about this many elements per input, instead of reading the full inputs.
+        tile_stats: optional TileStats that count the predicted and skipped tiles.
     """
     if not tiling:
         raise ValueError
-    assert len(inputs) == len(prediction_pipeline.input_specs)
-
-    tiling = _parse_tiling(tiling, prediction_pipeline.input_specs, prediction_pipeline.output_specs)
     if not isinstance(inputs, (list, tuple)):
         inputs = [inputs]
-    named_inputs: OrderedDict[str, xr.DataArray] = collections.OrderedDict(
+    assert len(inputs) == len(prediction_pipeline.input_specs)
+
+    named_inputs: OrderedDict[str, _LazyTensor] = collections.OrderedDict(
         **{
-            ipt_spec.name: xr.DataArray(ipt_data, dims=tuple(ipt_spec.axes))
+            ipt_spec.name: _LazyTensor.wrap(ipt_data, tuple(ipt_spec.axes))
             for ipt_data, ipt_spec in zip(inputs, prediction_pipeline.input_specs)
         }
     )
 
-    outputs = []
+    if isinstance(tiling, TilingPlan):
+        plan = tiling
+    else:
+        tiling = _parse_tiling(tiling, prediction_pipeline.input_specs, prediction_pipeline.output_specs)
+        # all inputs are tiled with the same spatial grid
+        grid_shape: Dict[str, int] = {}
+        for ipt in named_inputs.values():
+            for ax, sh in zip(ipt.dims, ipt.shape):
+                if ax in tiling["tile"] and grid_shape.setdefault(ax, sh) != sh:
+                    raise NotImplementedError("Tiling for inputs with different spatial shapes is not yet supported")
+
+        plan = _get_tiling_plan(
+            tuple(grid_shape.items()),
+            tuple((ax, tiling["tile"][ax]) for ax in grid_shape),
+            tuple((ax, tiling["halo"].get(ax, 0)) for ax in grid_shape),
+        )
+
+    output_shapes = []
     for output_spec in prediction_pipeline.output_specs:
         if isinstance(output_spec.shape, ImplicitOutputShape):
-            scale = dict(zip(output_spec.axes, output_spec.shape.scale))
-            offset = dict(zip(output_spec.axes, output_spec.shape.offset))
-
-            if any(sc != 1 for ax, sc in scale.items() if ax in "xyz") or any(
-                off != 0 for ax, off in offset.items() if ax in "xyz"
-            ):
-                raise NotImplementedError("Tiling with a different output shape is not yet supported")
-
+            scale, offset = _get_output_scale_offset(output_spec)
             ref_input = named_inputs[output_spec.shape.reference_tensor]
             ref_input_shape = dict(zip(ref_input.dims, ref_input.shape))
             output_shape = tuple(int(scale[ax] * ref_input_shape[ax] + 2 * offset[ax]) for ax in output_spec.axes)
         else:
-            if len(inputs) > 1:
-                raise NotImplementedError
-            input_spec = prediction_pipeline.input_specs[0]
-            if input_spec.axes != output_spec.axes:
+            # outputs with a fixed shape are placed in the grid of the first input with the same axes
+            ref_input = next((ipt for ipt in named_inputs.values() if ipt.dims == tuple(output_spec.axes)), None)
+            if ref_input is None:
                 raise NotImplementedError("Tiling with a different output shape is not yet supported")
             out_axes = output_spec.axes
             fixed_shape = tuple(output_spec.shape)
-            if not all(fixed_shape[out_axes.index(ax)] == tile_shape for ax, tile_shape in tiling["tile"].items()):
+            if not all(fixed_shape[out_axes.index(ax)] == tsh for ax, tsh in zip(plan.axes, plan.tile_shape)):
                 raise NotImplementedError("Tiling with a different output shape is not yet supported")
 
-            output_shape = list(inputs[0].shape)
+            output_shape = list(ref_input.shape)
             chan_id = out_axes.index("c")
             if fixed_shape[chan_id] != output_shape[chan_id]:
                 output_shape[chan_id] = fixed_shape[chan_id]
             output_shape = tuple(output_shape)
 
-        outputs.append(xr.DataArray(np.zeros(output_shape, dtype=output_spec.data_type), dims=tuple(output_spec.axes)))
+        output_shapes.append(output_shape)
 
-    _predict_with_tiling_impl(
+    if outputs is None:
+        outputs = [None] * len(prediction_pipeline.output_specs)
+    elif not isinstance(outputs, (list, tuple)):
+        outputs = [outputs]
+    if len(outputs) != len(prediction_pipeline.output_specs):
+        raise ValueError(f"Expected {len(prediction_pipeline.output_specs)} outputs, got {len(outputs)}")
+
+    outputs = list(outputs)
+    opened_outputs = []
+    for i, (out, output_shape, output_spec) in enumerate(zip(outputs, output_shapes, prediction_pipeline.output_specs)):
+        if out is None:
+            outputs[i] = xr.DataArray(np.zeros(output_shape, dtype=output_spec.data_type), dims=tuple(output_spec.axes))
+        elif isinstance(out, (str, os.PathLike)):
+            # the tiles are written straight to the file instead of being held in memory
+            out = image_helper.open_output(
+                out,
+                output_shape,
+                output_spec.data_type,
+                output_spec.axes,
+                chunks=_get_output_chunks(plan, output_spec, output_shape),
+                n_scales=n_scales,
+            )
+            opened_outputs.append(out)
+            outputs[i] = xr.DataArray(out, dims=tuple(output_spec.axes)) if isinstance(out, np.ndarray) else out
+        elif tuple(out.shape) != output_shape:
+            raise ValueError(
+                f"Invalid shape {tuple(out.shape)} for output '{output_spec.name}', expected {output_shape}"
+            )
+
+    sample_measures = None
+    if image_measures:
+        if tile_batch_size > 1 and any(ipt.sizes.get("b", 1) > 1 for ipt in named_inputs.values()):
+            raise ValueError("Image measures for inputs with a batch size > 1 require tile_batch_size=1")
+        sample_measures = _compute_image_measures(
+            prediction_pipeline, list(named_inputs.values()), max_size=image_measures_size
+        )
+
+    n_skipped = _predict_with_tiling_impl(
         prediction_pipeline,
         list(named_inputs.values()),
-        outputs,
-        tile_shapes=[tiling["tile"]],  # todo: update tiling for multiple inputs/outputs
-        halos=[tiling["halo"]],
+        [_LazyTensor.wrap(out, tuple(spec.axes)) for out, spec in zip(outputs, prediction_pipeline.output_specs)],
+        plan=plan,
         verbose=verbose,
+        tile_batch_size=tile_batch_size,
+        prefetch=prefetch,
+        tile_predicate=tile_predicate,
+        skip_fill_value=skip_fill_value,
+        sample_measures=sample_measures,
     )
+    if tile_predicate is not None:
+        logger.info("Skipped %d of %d tiles", n_skipped, len(plan))
+    if tile_stats is not None:
+        tile_stats.predicted += len(plan) - n_skipped
+        tile_stats.skipped += n_skipped
+
+    for out in opened_outputs:
+        if hasattr(out, "flush"):
+            out.flush()
 
     return outputs
 
 
-def _predict_sample(prediction_pipeline, inputs, outputs, padding, tiling):
+def _get_chunks_with_min_size(size: int, chunk: int, min_chunk: int) -> Tuple[int, ...]:
+    """split size into chunks of the given size, which are at least min_chunk large; a smaller last chunk is merged
+    into the previous one"""
+    chunk = max(chunk, min_chunk, 1)
+    chunks = [chunk] * (size // chunk)
+    rest = size % chunk
+    if rest and (rest >= min_chunk or not chunks):
+        chunks.append(rest)
+    elif rest:
+        chunks[-1] += rest
+
+    return tuple(chunks)
+
+
+def predict_with_dask(
+    prediction_pipeline: PredictionPipeline,
+    inputs: Union[xr.DataArray, "da.Array", List[Union[xr.DataArray, "da.Array"]]],
+    tiling: Union[bool, Dict[str, Dict[str, int]]] = True,
+) -> List[xr.DataArray]:
+    """Lazily predict a dask array with a bioimage.io model.
+
+    The input is rechunked, so that the chunks extended by the halo have the tile shape,
+    and the chunks are predicted independently with dask.array.map_overlap.
+    Chunks are at least as large as the halo, larger chunks are predicted with tiling.
+    The spatial axes of the input need to be at least as large as the halo.
+    The prediction only runs once the result is computed, e.g. chunk by chunk on a dask cluster.
+    Only models with a single input and a single output of the same spatial shape are supported.
+
+    Args:
+        prediction_pipeline: the prediction pipeline for the input model.
+        inputs: the input for this model as dask array, or as xarray data backed by dask or numpy arrays.
+        tiling: the tiling settings; the chunks are the tiles without the halo. Pass True to derive from the model spec.
+    """
+    if da is None:
+        raise ImportError("predict_with_dask requires dask")
+    if isinstance(inputs, (list, tuple)):
+        if len(inputs) != 1:
+            raise ValueError(f"Expected a single input, got {len(inputs)}")
+        inputs = inputs[0]
+    if len(prediction_pipeline.input_specs) != 1 or len(prediction_pipeline.output_specs) != 1:
+        raise NotImplementedError("Prediction with dask is only implemented for models with a single input and output")
+
+    input_spec = prediction_pipeline.input_specs[0]
+    output_spec = prediction_pipeline.output_specs[0]
+    axes = tuple(input_spec.axes)
+    data = da.asarray(inputs.transpose(*axes).data if isinstance(inputs, xr.DataArray) else inputs)
+    if data.ndim != len(axes):
+        raise ValueError(f"Expected input with axes {axes}, got shape {data.shape}")
+
+    scale, offset = _get_output_scale_offset(output_spec)
+    if set(output_spec.axes) != set(axes) or any((scale[ax], offset[ax]) != (1, 0) for ax in axes if ax in "xyz"):
+        raise NotImplementedError("Prediction with dask is only implemented for outputs with the shape of the input")
+
+    if isinstance(output_spec.shape, list):
+        output_sizes = dict(zip(output_spec.axes, output_spec.shape))
+    else:
+        output_sizes = {ax: int(sh * scale[ax] + 2 * offset[ax]) for ax, sh in zip(axes, data.shape)}
+
+    tiling = _parse_tiling(tiling, prediction_pipeline.input_specs, prediction_pipeline.output_specs)
+    tile = tiling["tile"]
+    halo = {ax: tiling["halo"].get(ax, 0) for ax in tile}
+
+    # one sample per chunk and all channels in one chunk; the spatial chunks are the tiles without halo,
+    # but at least as large as the halo, because dask would otherwise merge chunks to extend them by the halo
+    data = data.rechunk(
+        tuple(
+            _get_chunks_with_min_size(sh, tile[ax] - 2 * halo[ax], halo[ax]) if ax in tile else 1 if ax == "b" else -1
+            for ax, sh in zip(axes, data.shape)
+        )
+    )
+    depth = {i: halo[ax] for i, ax in enumerate(axes) if ax in tile}
+    output_chunks = tuple(ch if ax in tile or ax == "b" else (output_sizes[ax],) for ax, ch in zip(axes, data.chunks))
+
+    def predict_block(block: np.ndarray) -> np.ndarray:
+        # the block is the chunk extended by the halo on both sides of the spatial axes
+        block_shape = dict(zip(axes, block.shape))
+        if all(block_shape[ax] <= sh for ax, sh in tile.items()):
+            # chunks at the end of an axis can be smaller than the tile
+            pad_width = [(0, tile[ax] - block_shape[ax]) if ax in tile else (0, 0) for ax in axes]
+            padded = np.pad(block, pad_width, mode="symmetric") if any(p for _, p in pad_width) else block
+            result = predict(prediction_pipeline, xr.DataArray(padded, dims=axes))[0]
+        else:  # chunks that were enlarged to the size of the halo do not fit into a tile
+            result = predict_with_tiling(prediction_pipeline, xr.DataArray(block, dims=axes), tiling)[0]
+
+        crop = tuple(slice(halo[ax], block_shape[ax] - halo[ax]) if ax in tile else slice(None) for ax in axes)
+        return result.transpose(*axes).values[crop]
+
+    result = da.map_overlap(
+        predict_block,
+        data,
+        depth=depth,
+        boundary="reflect",
+        trim=False,
+        chunks=output_chunks,
+        dtype=np.dtype(output_spec.data_type),
+    )
+    return [xr.DataArray(result, dims=axes).transpose(*output_spec.axes)]
+
+
+async def apredict(
+    prediction_pipeline: PredictionPipeline,
+    inputs: Union[
+        xr.DataArray, List[xr.DataArray], Tuple[xr.DataArray], np.ndarray, List[np.ndarray], Tuple[np.ndarray]
+    ],
+    timeout: Optional[float] = None,
+) -> List[xr.DataArray]:
+    """Run prediction for a single set of input(s) like `predict`, without blocking the event loop.
+
+    The prediction runs in the thread dedicated to the prediction pipeline, see `PredictionPipeline.arun`.
+
+    Args:
+        prediction_pipeline: the prediction pipeline for the input model.
+        inputs: the input(s) for this model represented as xarray data or numpy nd array.
+        timeout: optional timeout in seconds, after which asyncio.TimeoutError is raised.
+    """
+    return await prediction_pipeline.arun(predict, prediction_pipeline, inputs, timeout=timeout)
+
+
+async def apredict_with_padding(
+    prediction_pipeline: PredictionPipeline,
+    inputs: Union[xr.DataArray, List[xr.DataArray], Tuple[xr.DataArray]],
+    padding: Union[bool, Dict[str, int]] = True,
+    pad_right: bool = True,
+    timeout: Optional[float] = None,
+) -> List[xr.DataArray]:
+    """Run prediction with padding like `predict_with_padding`, without blocking the event loop.
+
+    The prediction runs in the thread dedicated to the prediction pipeline, see `PredictionPipeline.arun`.
+
+    Args:
+        prediction_pipeline: the prediction pipeline for the input model.
+        inputs: the input(s) for this model represented as xarray data.
+        padding: the padding settings. Pass True to derive from the model spec.
+        pad_right: whether to applying padding to the right or left of the input.
+        timeout: optional timeout in seconds, after which asyncio.TimeoutError is raised.
+    """
+    return await prediction_pipeline.arun(
+        predict_with_padding, prediction_pipeline, inputs, padding, pad_right, timeout=timeout
+    )
+
+
+async def apredict_with_tiling(
+    prediction_pipeline: PredictionPipeline,
+    inputs: Union[xr.DataArray, List[xr.DataArray], Tuple[xr.DataArray]],
+    tiling: Union[bool, Dict[str, Dict[str, int]], TilingPlan] = True,
+    timeout: Optional[float] = None,
+    **kwargs: Any,
+) -> List[xr.DataArray]:
+    """Run prediction with tiling like `predict_with_tiling`, without blocking the event loop.
+
+    The prediction runs in the thread dedicated to the prediction pipeline, see `PredictionPipeline.arun`.
+
+    Args:
+        prediction_pipeline: the prediction pipeline for the input model.
+        inputs: the input(s) for this model, see `predict_with_tiling`.
+        tiling: the tiling settings. Pass True to derive from the model spec.
+        timeout: optional timeout in seconds, after which asyncio.TimeoutError is raised.
+        kwargs: further keyword arguments for `predict_with_tiling`.
+    """
+    return await prediction_pipeline.arun(
+        predict_with_tiling, prediction_pipeline, inputs, tiling, timeout=timeout, **kwargs
+    )
+
+
+def _predict_tensors(prediction_pipeline, input_data, padding, tiling) -> List[xr.DataArray]:
     if padding and tiling:
         raise ValueError("Only one of padding or tiling is supported")
 
-    input_data = image_helper.load_tensors(inputs, prediction_pipeline.input_specs)
     if padding is not None:
         result = predict_with_padding(prediction_pipeline, input_data, padding)
     elif tiling is not None:
@@ -391,32 +1196,204 @@ def _predict_sample(prediction_pipeline, inputs, outputs, padding, tiling):
         result = predict(prediction_pipeline, input_data)
 
     assert isinstance(result, list)
+    return result
+
+
+def _can_stack(samples: Sequence[Sequence[xr.DataArray]]) -> bool:
+    """check whether the samples can be stacked along the batch axis, i.e. all other axes match"""
+    for tensors in zip(*samples):
+        ref = tensors[0]
+        if "b" not in ref.dims:
+            return False
+
+        ref_sizes = {ax: sh for ax, sh in ref.sizes.items() if ax != "b"}
+        for tensor in tensors[1:]:
+            if tensor.dims != ref.dims or tensor.dtype != ref.dtype:
+                return False
+            if {ax: sh for ax, sh in tensor.sizes.items() if ax != "b"} != ref_sizes:
+                return False
+
+    return True
+
+
+def _predict_batch(prediction_pipeline, samples: Sequence[Sequence[xr.DataArray]], padding, tiling):
+    """predict several samples with one forward pass by stacking them along the batch axis
+
+    Falls back to predicting the samples one by one if they can't be stacked or the model does not support
+    the resulting batch size.
+    """
+    batch_sizes = [sample[0].sizes.get("b", 1) for sample in samples]
+    if (
+        len(samples) == 1
+        or not _can_stack(samples)
+        or not all("b" in spec.axes for spec in prediction_pipeline.output_specs)
+        or not all(_is_valid_batch_size(spec, sum(batch_sizes)) for spec in prediction_pipeline.input_specs)
+    ):
+        return [_predict_tensors(prediction_pipeline, sample, padding, tiling) for sample in samples]
+
+    batch = [xr.concat(tensors, dim="b") for tensors in zip(*samples)]
+    result = _predict_tensors(prediction_pipeline, batch, padding, tiling)
+    for res in result:
+        if res.sizes.get("b") != sum(batch_sizes):
+            raise ValueError(f"Cannot split output of shape {dict(res.sizes)} into {len(samples)} samples")
+
+    sample_results = []
+    start = 0
+    for n in batch_sizes:
+        sample_results.append([res[{"b": slice(start, start + n)}] for res in result])
+        start += n
+
+    return sample_results
+
+
+def _save_outputs(outputs, result, save_kwargs: Optional[Dict[str, Any]] = None):
     assert len(result) == len(outputs)
     for res, out in zip(result, outputs):
-        image_helper.save_image(out, res)
+        image_helper.save_image(out, res, **(save_kwargs or {}))
+
+
+def _predict_sample(prediction_pipeline, inputs, outputs, padding, tiling, mmap: bool = False, save_kwargs=None):
+    if mmap and padding is None and tiling is not None:
+        # the inputs are only read tile by tile (see image_helper.open_image) and the tiles of .npy outputs
+        # are written straight to disk, the other outputs are saved afterwards
+        to_save = [
+            os.path.splitext(out)[1] != ".npy" and image_helper.split_dataset_path(out) is None for out in outputs
+        ]
+        tiled_outputs = [None if save else out for out, save in zip(outputs, to_save)]
+        n_scales = (save_kwargs or {}).get("n_scales", 1)
+        with contextlib.ExitStack() as stack:
+            # close lazily read images (e.g. tiff volumes) once the sample is predicted
+            input_data = [
+                stack.enter_context(image_helper.open_image(inp, spec.axes))
+                for inp, spec in zip(inputs, prediction_pipeline.input_specs)
+            ]
+            result = predict_with_tiling(
+                prediction_pipeline, input_data, tiling, outputs=tiled_outputs, n_scales=n_scales
+            )
+            # the outputs that were written tile by tile are complete, so their files are released
+            for out, res in zip(tiled_outputs, result):
+                if out is not None:
+                    image_helper.close_output(out, res)
+
+        _save_outputs(
+            [out for out, save in zip(outputs, to_save) if save],
+            [res for res, save in zip(result, to_save) if save],
+            save_kwargs,
+        )
+    else:
+        input_data = image_helper.load_tensors(inputs, prediction_pipeline.input_specs, mmap=mmap)
+        _save_outputs(outputs, _predict_tensors(prediction_pipeline, input_data, padding, tiling), save_kwargs)
+
+
+def _load_sample(sample, input_specs) -> List[xr.DataArray]:
+    if not isinstance(sample, (tuple, list)):
+        sample = [sample]
+
+    if len(sample) != len(input_specs):
+        raise ValueError(f"Expected {len(input_specs)} input tensors per sample, got {len(sample)}")
+
+    tensors = []
+    for ipt, spec in zip(sample, input_specs):
+        if isinstance(ipt, (str, os.PathLike)):
+            ipt = image_helper.load_image(ipt, spec.axes)
+        elif not isinstance(ipt, xr.DataArray):
+            ipt = xr.DataArray(ipt, dims=tuple(spec.axes))
+        tensors.append(ipt)
+
+    return tensors
+
+
+def predict_stream(
+    prediction_pipeline: PredictionPipeline,
+    samples: Iterable[Any],
+    padding: Optional[Union[bool, Dict[str, int], ShapeBuckets]] = None,
+    tiling: Optional[Union[bool, Dict[str, Dict[str, int]]]] = None,
+    batch_size: int = 1,
+    num_io_workers: int = 0,
+    prefetch: int = 2,
+) -> Iterator[List[xr.DataArray]]:
+    """Lazily predict a stream of samples and yield the outputs of each sample in order.
+
+    Samples are only loaded once the outputs of the previous samples are requested, so at most
+    batch_size + prefetch samples are held in memory.
+
+    Args:
+        prediction_pipeline: the prediction pipeline for the input model.
+        samples: the samples to predict. A sample is given by the input(s) of the model as numpy arrays,
+            xarray data or filepaths of images, either as single input or as a tuple or list of inputs.
+        padding: the padding settings for prediction. By default no padding is used.
+        tiling: the tiling settings for prediction. By default no tiling is used.
+        batch_size: the number of consecutive samples of the same shape that are stacked along the batch axis
+            and predicted together. Samples are predicted one by one if the model does not support the batch size.
+        num_io_workers: the number of threads for loading the upcoming samples while the prediction pipeline is busy.
+            By default the samples are loaded in the main thread.
+        prefetch: the number of samples that are loaded ahead. Only used if num_io_workers > 0.
+    """
+    assert batch_size > 0
+    assert num_io_workers >= 0
+    assert prefetch >= 0
+
+    def load_sample(sample):
+        return _load_sample(sample, prediction_pipeline.input_specs)
+
+    def predict_loaded(loaded_samples):
+        # group consecutive samples of the same shape into batches
+        batch = []
+        for input_data in loaded_samples:
+            if batch and not _can_stack([batch[0], input_data]):
+                yield from _predict_batch(prediction_pipeline, batch, padding, tiling)
+                batch = []
+
+            batch.append(input_data)
+            if len(batch) == batch_size:
+                yield from _predict_batch(prediction_pipeline, batch, padding, tiling)
+                batch = []
+
+        if batch:
+            yield from _predict_batch(prediction_pipeline, batch, padding, tiling)
+
+    if num_io_workers == 0:
+        yield from predict_loaded(map(load_sample, samples))
+    else:
+        with ThreadPoolExecutor(max_workers=num_io_workers) as reader:
+            yield from predict_loaded(_prefetch(reader, load_sample, samples, prefetch))
 
 
 def predict_image(
     model_rdf: Union[RawResourceDescription, ResourceDescription, os.PathLike, str, dict, raw_nodes.URI],
     inputs: Union[Tuple[Path, ...], List[Path], Path],
     outputs: Union[Tuple[Path, ...], List[Path], Path],
-    padding: Optional[Union[bool, Dict[str, int]]] = None,
+    padding: Optional[Union[bool, Dict[str, int], ShapeBuckets]] = None,
     tiling: Optional[Union[bool, Dict[str, Dict[str, int]]]] = None,
     weight_format: Optional[str] = None,
     devices: Optional[List[str]] = None,
     verbose: bool = False,
+    mmap: bool = False,
+    multichannel: str = "split",
+    compression: Optional[str] = None,
+    n_scales: int = 1,
 ):
     """Run prediction for a single set of input image(s) with a bioimage.io model.
 
     Args:
         model_rdf: the bioimageio model.
-        inputs: the filepaths for the input images.
-        outputs: the filepaths for saving the input images.
+        inputs: the filepaths for the input images, or dataset paths in chunked containers
+            like file.zarr/raw or file.h5:/volume.
+        outputs: the filepaths for saving the input images, or dataset paths in chunked containers.
         padding: the padding settings for prediction. By default no padding is used.
         tiling: the tiling settings for prediction. By default no tiling is used.
         weight_format: the weight format to use for predictions.
         devices: the devices to use for prediction.
         verbose: run prediction in verbose mode.
+        mmap: memory map .npy and uncompressed tiff inputs, so that they are only read tile by tile. With tiling
+            compressed tiff volumes are decoded page by page and the tiles of .npy outputs are written straight
+            to the output files instead of holding the outputs in memory.
+        multichannel: how to save outputs with a number of channels that is not supported by the image format:
+            'split' saves each channel to a separate file, 'imagej' and 'ome' save tiff outputs as a single
+            ImageJ hyperstack or OME-TIFF. See image_helper.save_image.
+        compression: the compression of tiff outputs, e.g. 'zlib'.
+        n_scales: the number of resolution levels of outputs in chunked containers, which are saved as multiscale
+            groups in the layout of OME-Zarr. With mmap and tiling the levels are built while the tiles are written.
     """
     if not isinstance(inputs, (tuple, list)):
         inputs = [inputs]
@@ -434,48 +1411,290 @@ def predict_image(
     with create_prediction_pipeline(
         bioimageio_model=model, weight_format=weight_format, devices=devices
     ) as prediction_pipeline:
-        _predict_sample(prediction_pipeline, inputs, outputs, padding, tiling)
+        _predict_sample(
+            prediction_pipeline,
+            inputs,
+            outputs,
+            padding,
+            tiling,
+            mmap=mmap,
+            save_kwargs={"multichannel": multichannel, "compression": compression, "n_scales": n_scales},
+        )
+
+
+def _predict_samples(
+    prediction_pipeline: PredictionPipeline,
+    samples: Sequence[Tuple[List[Path], List[Path]]],
+    padding,
+    tiling,
+    verbose: bool = False,
+    num_io_workers: int = 0,
+    prefetch: int = 2,
+    batch_size: int = 1,
+    mmap: bool = False,
+    save_kwargs: Optional[Dict[str, Any]] = None,
+):
+    """predict the samples, given as pairs of input and output paths, in order with one prediction pipeline"""
+    if mmap:
+        # memory mapped samples are read and written tile by tile during the prediction
+        for inp, outp in tqdm(samples, disable=not verbose):
+            _predict_sample(prediction_pipeline, inp, outp, padding, tiling, mmap=True, save_kwargs=save_kwargs)
+        return
+
+    results = predict_stream(
+        prediction_pipeline,
+        [inp for inp, _ in samples],
+        padding=padding,
+        tiling=tiling,
+        batch_size=batch_size,
+        num_io_workers=num_io_workers,
+        prefetch=prefetch,
+    )
+    prog = zip(samples, results)
+    if verbose:
+        prog = tqdm(prog, total=len(samples))
+
+    if num_io_workers == 0:
+        for (_, outp), result in prog:
+            _save_outputs(outp, result, save_kwargs)
+    else:
+        # encode the finished outputs in background threads while the prediction pipeline is busy
+        with ThreadPoolExecutor(max_workers=num_io_workers) as writer:
+            pending_saves: Deque[Future] = collections.deque()
+            try:
+                for (_, outp), result in prog:
+                    pending_saves.append(writer.submit(_save_outputs, outp, result, save_kwargs))
+                    while len(pending_saves) > prefetch:
+                        pending_saves.popleft().result()
+            finally:
+                # wait for all outputs to be saved (and raise their errors) before returning
+                while pending_saves:
+                    pending_saves.popleft().result()
+
+
+# the prediction pipeline of a worker process of predict_images
+_worker_pipeline: Optional[PredictionPipeline] = None
+
+
+def _init_prediction_worker(rdf_source, weight_format: Optional[str], devices: Optional[List[str]], num_threads: int):
+    """load the prediction pipeline of a worker process and limit the threads it uses,
+    so that the worker processes don't compete for the same cores"""
+    global _worker_pipeline
+
+    # the environment variables only apply to the libraries that are loaded from now on, e.g. tensorflow;
+    # numpy (and its BLAS) has already been loaded to unpickle this function
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "TF_NUM_INTEROP_THREADS", "TF_NUM_INTRAOP_THREADS"):
+        os.environ[var] = str(num_threads)
+
+    model = load_resource_description(rdf_source)
+    model_adapter = create_model_adapter(bioimageio_model=model, devices=devices, weight_format=weight_format)
+    if hasattr(model_adapter, "intra_op_num_threads"):  # onnxruntime does not use the environment variables
+        model_adapter.intra_op_num_threads = num_threads
+
+    _worker_pipeline = create_prediction_pipeline(bioimageio_model=model, model_adapter=model_adapter)
+    _worker_pipeline.load()
+
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(num_threads)
+
+    # limit the thread pools of the BLAS and OpenMP libraries that have already been loaded
+    if threadpoolctl is not None:
+        threadpoolctl.threadpool_limits(num_threads)
+
+
+def _predict_samples_in_worker(
+    samples, padding, tiling, num_io_workers: int, prefetch: int, batch_size: int, mmap: bool, save_kwargs
+):
+    """predict the samples with the pipeline of the worker process and return the padding,
+    so that the counts of ShapeBuckets are sent back to the main process"""
+    assert _worker_pipeline is not None, "worker process was not initialized"
+    _predict_samples(
+        _worker_pipeline, samples, padding, tiling, False, num_io_workers, prefetch, batch_size, mmap, save_kwargs
+    )
+    return padding
+
+
+def _predict_samples_with_workers(
+    rdf_source,
+    samples: Sequence[Tuple[List[Path], List[Path]]],
+    padding,
+    tiling,
+    weight_format: Optional[str],
+    devices: Optional[List[str]],
+    verbose: bool,
+    num_workers: int,
+    num_io_workers: int,
+    prefetch: int,
+    batch_size: int,
+    mmap: bool,
+    save_kwargs: Dict[str, Any],
+):
+    """share out the samples to worker processes that each run their own prediction pipeline
+
+    The workers load the model from rdf_source, which is sent to each of them.
+    The bucket counts of ShapeBuckets padding are counted in the workers and merged into padding.
+    """
+    num_threads = max(1, (os.cpu_count() or 1) // num_workers)
+    # the samples of one batch are sent to the same worker
+    chunks = [samples[start : start + batch_size] for start in range(0, len(samples), batch_size)]
+    failed = []
+    with ProcessPoolExecutor(
+        max_workers=num_workers,
+        # the deep learning frameworks are not fork-safe, so the workers are started as new processes
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_prediction_worker,
+        initargs=(rdf_source, weight_format, devices, num_threads),
+    ) as executor:
+        futures = {}
+        for chunk in chunks:
+            future = executor.submit(
+                _predict_samples_in_worker,
+                chunk,
+                # the workers count the samples of their chunk in empty buckets, which are merged afterwards
+                ShapeBuckets(padding.sizes) if isinstance(padding, ShapeBuckets) else padding,
+                tiling,
+                num_io_workers,
+                prefetch,
+                batch_size,
+                mmap,
+                save_kwargs,
+            )
+            futures[future] = chunk
+
+        prog = tqdm(total=len(samples), disable=not verbose)
+        for future in as_completed(futures):
+            chunk = futures[future]
+            try:
+                worker_padding = future.result()
+            except Exception as e:
+                logger.error("Prediction failed for the inputs %s: %s", [inp for inp, _ in chunk], e)
+                failed.append((chunk, e))
+            else:
+                if isinstance(padding, ShapeBuckets):
+                    padding.merge(worker_padding)
+            prog.update(len(chunk))
+
+        prog.close()
+
+    # errors are collected, so that the predictions of the other samples are not lost
+    if failed:
+        n_failed = sum(len(chunk) for chunk, _ in failed)
+        raise RuntimeError(
+            f"Prediction failed for {n_failed} of {len(samples)} samples, the first error was: {failed[0][1]}"
+        ) from failed[0][1]
 
 
 def predict_images(
     model_rdf: Union[RawResourceDescription, ResourceDescription, os.PathLike, str, dict, raw_nodes.URI],
     inputs: Sequence[Union[Tuple[Path, ...], List[Path], Path]],
     outputs: Sequence[Union[Tuple[Path, ...], List[Path], Path]],
-    padding: Optional[Union[bool, Dict[str, int]]] = None,
+    padding: Optional[Union[bool, Dict[str, int], ShapeBuckets]] = None,
     tiling: Optional[Union[bool, Dict[str, Dict[str, int]]]] = None,
     weight_format: Optional[str] = None,
     devices: Optional[List[str]] = None,
     verbose: bool = False,
+    num_io_workers: int = 0,
+    prefetch: int = 2,
+    batch_size: int = 1,
+    num_workers: int = 0,
+    mmap: bool = False,
+    multichannel: str = "split",
+    compression: Optional[str] = None,
+    n_scales: int = 1,
 ):
     """Predict multiple input images with a bioimage.io model.
 
     Args:
         model_rdf: the bioimageio model.
-        inputs: the filepaths for the input images.
-        outputs: the filepaths for saving the input images.
+        inputs: the filepaths for the input images, or dataset paths in chunked containers
+            like file.zarr/raw or file.h5:/volume.
+        outputs: the filepaths for saving the input images, or dataset paths in chunked containers.
         padding: the padding settings for prediction. By default no padding is used.
         tiling: the tiling settings for prediction. By default no tiling is used.
         weight_format: the weight format to use for predictions.
         devices: the devices to use for prediction.
         verbose: run prediction in verbose mode.
+        num_io_workers: the number of threads for loading the input images and saving the outputs,
+            so that image decoding and encoding overlap with the prediction. By default this is done in the main thread.
+        prefetch: the number of samples that are loaded ahead and the number of samples whose outputs
+            may still be saved in the background. Only used if num_io_workers > 0.
+        batch_size: the number of consecutive samples of the same shape that are stacked along the batch axis
+            and predicted together. Samples are predicted one by one if the model does not support the batch size.
+        num_workers: the number of worker processes, each with its own prediction pipeline and an equal share of
+            the cpu threads. The samples are distributed to the workers, errors are collected and raised at the end.
+            By default all samples are predicted in this process. The workers load the model themselves, so model_rdf
+            needs to be the source of the model (e.g. a path or url) or a raw resource description.
+            The bucket counts of ShapeBuckets padding include the samples of all workers.
+        mmap: memory map .npy and uncompressed tiff inputs, so that they are only read tile by tile. With tiling
+            compressed tiff volumes are decoded page by page and the tiles of .npy outputs are written straight
+            to the output files instead of holding the outputs in memory.
+            The samples are then predicted one by one.
+        multichannel: how to save outputs with a number of channels that is not supported by the image format:
+            'split' saves each channel to a separate file, 'imagej' and 'ome' save tiff outputs as a single
+            ImageJ hyperstack or OME-TIFF. See image_helper.save_image.
+        compression: the compression of tiff outputs, e.g. 'zlib'.
+        n_scales: the number of resolution levels of outputs in chunked containers, which are saved as multiscale
+            groups in the layout of OME-Zarr. With mmap and tiling the levels are built while the tiles are written.
     """
+    assert num_io_workers >= 0
+    assert prefetch >= 0
+    assert batch_size > 0
+    assert num_workers >= 0
 
     model = load_resource_description(model_rdf)
     assert isinstance(model, Model)
 
-    with create_prediction_pipeline(
-        bioimageio_model=model, weight_format=weight_format, devices=devices
-    ) as prediction_pipeline:
+    samples = []
+    for inp, outp in zip(inputs, outputs):
+        if not isinstance(inp, (tuple, list)):
+            inp = [inp]
 
-        prog = zip(inputs, outputs)
-        if verbose:
-            prog = tqdm(prog, total=len(inputs))
+        if not isinstance(outp, (tuple, list)):
+            outp = [outp]
 
-        for inp, outp in prog:
-            if not isinstance(inp, (tuple, list)):
-                inp = [inp]
+        samples.append((inp, outp))
 
-            if not isinstance(outp, (tuple, list)):
-                outp = [outp]
+    save_kwargs = {"multichannel": multichannel, "compression": compression, "n_scales": n_scales}
+    if batch_size > 1 and not all(_is_valid_batch_size(spec, batch_size) for spec in model.inputs):
+        warnings.warn(f"Model does not support a batch of {batch_size} samples, predicting samples one by one.")
+        batch_size = 1
 
-            _predict_sample(prediction_pipeline, inp, outp, padding, tiling)
+    if num_workers > 0:
+        # the resolved model contains imported code and is expensive (or impossible) to send to the workers
+        if isinstance(model_rdf, ResourceDescription):
+            raise ValueError(
+                "Prediction with num_workers > 0 requires the source of the model (e.g. its path or url) "
+                "or its raw resource description instead of the loaded model"
+            )
+        _predict_samples_with_workers(
+            model_rdf,
+            samples,
+            padding,
+            tiling,
+            weight_format,
+            devices,
+            verbose,
+            num_workers,
+            num_io_workers,
+            prefetch,
+            batch_size,
+            mmap,
+            save_kwargs,
+        )
+    else:
+        with create_prediction_pipeline(
+            bioimageio_model=model, weight_format=weight_format, devices=devices
+        ) as prediction_pipeline:
+            _predict_samples(
+                prediction_pipeline,
+                samples,
+                padding,
+                tiling,
+                verbose,
+                num_io_workers,
+                prefetch,
+                batch_size,
+                mmap,
+                save_kwargs,
+            )
@@ -1,2 +1,2 @@
 from ._model_adapters import get_weight_formats
-from ._prediction_pipeline import PredictionPipeline, create_prediction_pipeline
+from ._prediction_pipeline import PredictionPipeline, acreate_prediction_pipeline, create_prediction_pipeline
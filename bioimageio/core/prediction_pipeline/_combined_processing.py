@@ -1,7 +1,7 @@
 from typing import List, Optional, Sequence, Union
 
 from bioimageio.core.resource_io import nodes
-from ._processing import EnsureDtype, KNOWN_PROCESSING, Processing
+from ._processing import FusedProcessing, KNOWN_PROCESSING, Processing
 from ._utils import ComputedMeasures, PER_DATASET, PER_SAMPLE, RequiredMeasures, Sample
 
 try:
@@ -32,16 +32,19 @@ class CombinedProcessing:
             else:
                 raise NotImplementedError(t)
 
-            for step in steps:
-                self._procs.append(KNOWN_PROCESSING[proc_prefix][step.name](tensor_name=t.name, **step.kwargs))
-
-        # There is a difference between pre-and-postprocessing:
-        # Pre-processing always returns float32, because its output is consumed by the model.
-        # Post-processing, however, should return the dtype that is specified in the model spec.
-        # todo: cast dtype for inputs before preprocessing? or check dtype?
-        if proc_prefix == POST:
-            for t in tensor_specs:
-                self._procs.append(EnsureDtype(tensor_name=t.name, dtype=t.data_type))
+            # There is a difference between pre-and-postprocessing:
+            # Pre-processing always returns float32, because its output is consumed by the model.
+            # Post-processing, however, should return the dtype that is specified in the model spec.
+            # todo: cast dtype for inputs before preprocessing? or check dtype?
+            if steps or proc_prefix == POST:
+                # the steps of each tensor are fused into a single pass over the tensor data
+                self._procs.append(
+                    FusedProcessing(
+                        tensor_name=t.name,
+                        steps=[KNOWN_PROCESSING[proc_prefix][s.name](tensor_name=t.name, **s.kwargs) for s in steps],
+                        dtype=t.data_type if proc_prefix == POST else None,
+                    )
+                )
 
         self.required_measures: RequiredMeasures = self._collect_required_measures(self._procs)
         if proc_prefix == POST and self.required_measures[PER_DATASET]:
@@ -9,7 +9,15 @@ from typing import DefaultDict, Dict, Hashable, Iterator, List, Mapping, Optiona
 import numpy
 import xarray as xr
 
-from bioimageio.core.statistical_measures import Mean, Measure, Percentile, Std, Var
+from bioimageio.core.statistical_measures import (
+    Mean,
+    Measure,
+    Percentile,
+    StandardError,
+    Std,
+    Var,
+    compute_quantiles,
+)
 from ._utils import ComputedMeasures, PER_DATASET, PER_SAMPLE, RequiredMeasures, Sample, TensorName
 
 try:
@@ -22,9 +30,31 @@ try:
 except ImportError:
     crick = None
 
+try:
+    import dask
+except ImportError:
+    dask = None
+
 MeasureValue = xr.DataArray
 
 
+def _compute(*tensors: xr.DataArray) -> Tuple[xr.DataArray, ...]:
+    """compute lazy results of dask backed tensors in one go, so that dask reduces them in a single pass over the
+    chunks of the data; results of numpy backed tensors are returned as they are"""
+    if any(t.chunks is not None for t in tensors):
+        return dask.compute(*tensors)
+    else:
+        return tensors
+
+
+def _quantile(tensor: xr.DataArray, qs: Sequence[float], axes: Optional[Tuple[str]]) -> xr.DataArray:
+    if tensor.chunks is not None:  # dask computes quantiles per chunk of the remaining axes
+        tensor = tensor.chunk({d: -1 for d in (tensor.dims if axes is None else axes)})
+        return _compute(tensor.quantile(qs, dim=axes))[0]
+
+    return compute_quantiles(tensor, qs, axes)
+
+
 class SampleMeasureGroup:
     """group of measures for more efficient computation of multiple measures per sample"""
 
@@ -68,7 +98,7 @@ class DatasetMean(DatasetMeasureGroup):
 
     def update_with_sample(self, sample: Sample):
         tensor = sample[self.tensor_name].astype(numpy.float64, copy=False)
-        mean_b = tensor.mean(dim=self.axes)
+        (mean_b,) = _compute(tensor.mean(dim=self.axes))
         assert mean_b.dtype == numpy.float64
         n_b = numpy.prod(tensor.shape) / numpy.prod(mean_b.shape)  # reduced voxel count
         if self.n == 0:
@@ -101,11 +131,21 @@ class MeanVarStd(SampleMeasureGroup, DatasetMeasureGroup):
 
     def compute(self, sample: Sample) -> Dict[TensorName, Dict[Measure, MeasureValue]]:
         tensor = sample[self.tensor_name]
-        mean = tensor.mean(dim=self.axes)
-        c = tensor - mean
-        n = tensor.size if self.axes is None else numpy.prod([tensor.sizes[d] for d in self.axes])
-        var = xr.dot(c, c, dims=self.axes) / n
-        std = numpy.sqrt(var)
+        if tensor.chunks is None:  # with numpy directly, xarray's overhead dominates for small tensors
+            data = numpy.asarray(tensor.data)
+            axis = None if self.axes is None else tuple(tensor.dims.index(d) for d in self.axes)
+            # like xarray, skip NaN values for the mean of floats
+            mean = (numpy.nanmean if data.dtype.kind == "f" else numpy.mean)(data, axis=axis, keepdims=True)
+            c = data - mean
+            numpy.multiply(c, c, out=c)
+            var = numpy.mean(c, axis=axis, keepdims=True)
+            dims = () if self.axes is None else tuple(d for d in tensor.dims if d not in self.axes)
+            mean, var = (xr.DataArray(numpy.squeeze(m, axis=axis), dims=dims) for m in (mean, var))
+            std = numpy.sqrt(var)
+        else:  # single pass over the chunks
+            mean, var = _compute(tensor.mean(dim=self.axes), tensor.var(dim=self.axes))
+            std = numpy.sqrt(var)
+
         return {self.tensor_name: {Mean(axes=self.axes): mean, Var(axes=self.axes): var, Std(axes=self.axes): std}}
 
     def reset(self):
@@ -115,10 +155,15 @@ class MeanVarStd(SampleMeasureGroup, DatasetMeasureGroup):
 
     def update_with_sample(self, sample: Sample):
         tensor = sample[self.tensor_name].astype(numpy.float64, copy=False)
-        mean_b = tensor.mean(dim=self.axes)
+        if tensor.chunks is None:
+            mean_b = tensor.mean(dim=self.axes)
+            m2_b = ((tensor - mean_b) ** 2).sum(dim=self.axes)
+        else:  # single pass over the chunks
+            mean_b, var_b = _compute(tensor.mean(dim=self.axes), tensor.var(dim=self.axes))
+            m2_b = var_b * (tensor.size / mean_b.size)
+
         assert mean_b.dtype == numpy.float64
         n_b = numpy.prod(tensor.shape) / numpy.prod(mean_b.shape)  # reduced voxel count
-        m2_b = ((tensor - mean_b) ** 2).sum(dim=self.axes)
         assert m2_b.dtype == numpy.float64
         if self.n == 0:
             assert self.mean is None
@@ -161,7 +206,7 @@ class SamplePercentiles(SampleMeasureGroup):
 
     def compute(self, sample: Sample) -> Dict[TensorName, Dict[Measure, MeasureValue]]:
         tensor = sample[self.tensor_name]
-        ps = tensor.quantile(self.qs, dim=self.axes)
+        ps = _quantile(tensor, self.qs, self.axes)
         return {self.tensor_name: {Percentile(n=n, axes=self.axes): p for n, p in zip(self.ns, ps)}}
 
 
@@ -183,7 +228,7 @@ class MeanPercentiles(DatasetMeasureGroup):
 
     def update_with_sample(self, sample: Sample):
         tensor = sample[self.tensor_name]
-        sample_estimates = tensor.quantile(self.qs, dim=self.axes).astype(numpy.float64, copy=False)
+        sample_estimates = _quantile(tensor, self.qs, self.axes).astype(numpy.float64, copy=False)
 
         n = numpy.prod(tensor.shape) / numpy.prod(sample_estimates.shape[1:])  # reduced voxel count
 
@@ -272,17 +317,19 @@ class SingleMeasureAsGroup(SampleMeasureGroup):
         self.measure = measure
 
     def compute(self, sample: Sample) -> Dict[TensorName, Dict[Measure, MeasureValue]]:
-        return {self.tensor_name: {self.measure: self.measure.compute(sample[self.tensor_name])}}
+        (value,) = _compute(self.measure.compute(sample[self.tensor_name]))
+        return {self.tensor_name: {self.measure: value}}
 
 
 def get_measure_groups(measures: RequiredMeasures) -> MeasureGroups:
     """find a list of MeasureGroups to compute measures efficiently"""
 
     measure_groups = {PER_SAMPLE: [], PER_DATASET: []}
-    means: Set[Tuple[TensorName, Mean]] = set()
-    mean_var_std_groups: Set[Tuple[TensorName, Optional[Tuple[str, ...]]]] = set()
-    percentile_groups: DefaultDict[Tuple[TensorName, Optional[Tuple[str, ...]]], List[float]] = defaultdict(list)
     for mode, ms_per_mode in measures.items():
+        # the groups are collected per mode, a per sample measure must not create a per dataset group
+        means: Set[Tuple[TensorName, Mean]] = set()
+        mean_var_std_groups: Set[Tuple[TensorName, Optional[Tuple[str, ...]]]] = set()
+        percentile_groups: DefaultDict[Tuple[TensorName, Optional[Tuple[str, ...]]], List[float]] = defaultdict(list)
         for tn, ms_per_tn in ms_per_mode.items():
             for m in ms_per_tn:
                 if isinstance(m, Mean):
@@ -321,15 +368,102 @@ def get_measure_groups(measures: RequiredMeasures) -> MeasureGroups:
     return measure_groups
 
 
+def get_subsample_strides(sizes: Mapping[str, int], axes: Sequence[str], size: int) -> Dict[str, int]:
+    """strides along axes for a regular subsample of about size elements of a tensor with the given sizes;
+    empty if the tensor is not larger than size. Lazily indexable arrays are read with these strides, too."""
+    axes = [d for d in sizes if d in axes and sizes[d] > 1]
+    n = int(numpy.prod([sizes[d] for d in axes]))
+    k = max(1, size // (int(numpy.prod(list(sizes.values()))) // n))  # number of elements per index of the other axes
+    if not axes or k >= n:
+        return {}
+
+    stride = int(numpy.ceil((n / k) ** (1 / len(axes))))
+    return {d: stride for d in axes}
+
+
+def subsample(tensor: xr.DataArray, axes: Sequence[str], size: int, method: str = "random") -> xr.DataArray:
+    """subsample tensor to about size elements along axes; the other axes are kept as they are
+
+    Args:
+        tensor: tensor to subsample
+        axes: axes to subsample, which need to be reduced by the measures that are estimated from the subsample
+        size: number of elements of the subsample
+        method: 'random' draws the elements uniformly without replacement (the same for each index of the other axes),
+            'strided' takes every n-th element along the axes, which does not copy the data. Dask backed
+            tensors are always subsampled with a stride.
+    """
+    if method == "strided" or tensor.chunks is not None:
+        strides = get_subsample_strides(tensor.sizes, axes, size)
+        return tensor[{d: slice(None, None, s) for d, s in strides.items()}] if strides else tensor
+    elif method == "random":
+        axes = [d for d in tensor.dims if d in axes and tensor.sizes[d] > 1]
+        n = int(numpy.prod([tensor.sizes[d] for d in axes]))
+        k = max(1, size // (tensor.size // n))  # number of elements per index of the other axes
+        if not axes or k >= n:
+            return tensor
+
+        # a fixed seed, so that the same tensor always gives the same estimates
+        flat_idx = numpy.sort(numpy.random.default_rng(0).choice(n, size=k, replace=False))
+        idx = numpy.unravel_index(flat_idx, [tensor.sizes[d] for d in axes])
+        sub = tensor.isel({d: xr.DataArray(i, dims="_subsample") for d, i in zip(axes, idx)})
+        # put the subsample along the first of the axes and keep the others with size 1
+        return sub.rename({"_subsample": axes[0]}).expand_dims(axes[1:]).transpose(*tensor.dims)
+    else:
+        raise ValueError(f"Unknown subsample method {method}")
+
+
+def estimate_standard_errors(
+    tensor: xr.DataArray, measures: Mapping[Measure, MeasureValue]
+) -> Dict[Measure, MeasureValue]:
+    """estimate the standard errors of measures that were computed from the (random) subsample tensor
+
+    The errors assume independently drawn elements. The errors of the variance and standard deviation are estimated
+    from the fourth central moment, those of the percentiles from the range of percentiles within one standard
+    deviation of their rank. Measures without an error estimate are skipped.
+    """
+    errors = {}
+    moments: Dict[Optional[Tuple[str, ...]], Tuple[xr.DataArray, xr.DataArray]] = {}
+    for m, v in measures.items():
+        if not isinstance(m, (Mean, Std, Var, Percentile)):
+            continue
+
+        n = tensor.size if m.axes is None else int(numpy.prod([tensor.sizes[d] for d in m.axes]))
+        if isinstance(m, (Mean, Std, Var)):
+            if m.axes not in moments:
+                c = tensor.astype(numpy.float64)
+                c = c - c.mean(dim=m.axes)
+                c2 = c * c
+                moments[m.axes] = _compute(c2.mean(dim=m.axes), (c2 * c2).mean(dim=m.axes))
+
+            var, m4 = moments[m.axes]
+            var_error = numpy.sqrt(numpy.maximum(m4 - var**2, 0) / n)
+            if isinstance(m, Mean):
+                errors[StandardError(m)] = numpy.sqrt(var / n)
+            elif isinstance(m, Var):
+                errors[StandardError(m)] = var_error
+            else:
+                errors[StandardError(m)] = var_error / (2 * numpy.sqrt(var))
+        else:
+            q = m.n / 100
+            s = numpy.sqrt(q * (1 - q) / n)
+            lower, upper = _quantile(tensor, [max(q - s, 0.0), min(q + s, 1.0)], m.axes).drop_vars("quantile")
+            errors[StandardError(m)] = (upper - lower) / 2
+
+    return errors
+
+
 def compute_measures(
     measures: RequiredMeasures, *, sample: Optional[Sample] = None, dataset: Iterator[Sample] = tuple()
 ) -> ComputedMeasures:
+    """compute the required measures; the measures of one tensor may be computed by several groups (e.g. a mean
+    over some axes and a variance over all axes), so the results of the groups are merged per tensor"""
     ms_groups = get_measure_groups(measures)
     ret = {PER_SAMPLE: {}, PER_DATASET: {}}
     if sample is not None:
         for mg in ms_groups[PER_SAMPLE]:
             assert isinstance(mg, SampleMeasureGroup)
-            ret[PER_SAMPLE].update(mg.compute(sample))
+            for tn, vals in mg.compute(sample).items():
+                ret[PER_SAMPLE].setdefault(tn, {}).update(vals)
 
     for sample in dataset:
         for mg in ms_groups[PER_DATASET]:
@@ -338,6 +472,7 @@ def compute_measures(
 
     for mg in ms_groups[PER_DATASET]:
         assert isinstance(mg, DatasetMeasureGroup)
-        ret[PER_DATASET].update(mg.finalize())
+        for tn, vals in mg.finalize().items():
+            ret[PER_DATASET].setdefault(tn, {}).update(vals)
 
     return ret
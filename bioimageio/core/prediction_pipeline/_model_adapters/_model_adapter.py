@@ -5,6 +5,7 @@ import xarray as xr
 
 from bioimageio.core import load_resource_description
 from bioimageio.core.resource_io import nodes
+from .._utils import get_dedicated_executor, run_in_executor
 
 #: Known weight formats in order of priority
 #: First match wins
@@ -57,6 +58,13 @@ class ModelAdapter(abc.ABC):
         self._load(devices=devices or self.default_devices)
         self.loaded = True
 
+    async def aload(self, *, devices: Optional[Sequence[str]] = None, timeout: Optional[float] = None) -> None:
+        """
+        Load model onto devices like `load`, but without blocking the event loop.
+        The model is loaded in a thread dedicated to this model adapter.
+        """
+        await run_in_executor(get_dedicated_executor(self), self.load, devices=devices, timeout=timeout)
+
     @abc.abstractmethod
     def _load(self, *, devices: Optional[Sequence[str]] = None) -> None:
         """
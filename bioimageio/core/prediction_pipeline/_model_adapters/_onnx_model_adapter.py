@@ -11,10 +11,17 @@ logger = logging.getLogger(__name__)
 
 
 class ONNXModelAdapter(ModelAdapter):
+    #: number of threads used to run the model; None uses the onnxruntime default of one thread per core
+    intra_op_num_threads: Optional[int] = None
+
     def _load(self, *, devices: Optional[List[str]] = None):
         self._internal_output_axes = [tuple(out.axes) for out in self.bioimageio_model.outputs]
 
-        self._session = rt.InferenceSession(str(self.bioimageio_model.weights["onnx"].source))
+        options = rt.SessionOptions()
+        if self.intra_op_num_threads is not None:
+            options.intra_op_num_threads = self.intra_op_num_threads
+
+        self._session = rt.InferenceSession(str(self.bioimageio_model.weights["onnx"].source), sess_options=options)
         onnx_inputs = self._session.get_inputs()
         self._input_names = [ipt.name for ipt in onnx_inputs]
 
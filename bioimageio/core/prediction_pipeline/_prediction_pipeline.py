@@ -1,6 +1,6 @@
 import abc
 from dataclasses import dataclass
-from typing import Iterable, List, Optional, Sequence, Tuple, Union
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple, TypeVar, Union
 
 import xarray as xr
 from marshmallow import missing
@@ -10,10 +10,20 @@ from bioimageio.spec.model import raw_nodes
 from ._combined_processing import CombinedProcessing
 from ._model_adapters import ModelAdapter, create_model_adapter
 from ._stat_state import StatsState
-from ._utils import ComputedMeasures, Sample, TensorName
+from ._utils import (
+    ComputedMeasures,
+    Sample,
+    TensorMeasures,
+    TensorName,
+    get_dedicated_executor,
+    run_in_executor,
+    shutdown_dedicated_executor,
+)
 from .. import load_resource_description
 from ..resource_io.utils import resolve_raw_node
 
+T = TypeVar("T")
+
 
 @dataclass
 class NamedImplicitOutputShape:
@@ -40,12 +50,23 @@ class PredictionPipeline(abc.ABC):
         ...
 
     @abc.abstractmethod
-    def forward(self, *input_tensors: xr.DataArray) -> List[xr.DataArray]:
+    def forward(
+        self, *input_tensors: xr.DataArray, sample_measures: Optional[TensorMeasures] = None
+    ) -> List[xr.DataArray]:
         """
         Compute predictions
+        sample_measures are used instead of the per sample statistics of the input tensors for preprocessing,
+        e.g. the statistics of a whole image for one of its tiles (see `compute_sample_measures`)
         """
         ...
 
+    def compute_sample_measures(self, *input_tensors: xr.DataArray) -> TensorMeasures:
+        """
+        Compute the per sample statistics that are required for preprocessing the input tensors
+        Note: This default implementation computes none, so `forward` computes them for each call.
+        """
+        return {}
+
     @property
     @abc.abstractmethod
     def name(self) -> str:
@@ -84,6 +105,59 @@ class PredictionPipeline(abc.ABC):
         """
         ...
 
+    @property
+    def _executor_owner(self) -> Any:
+        """
+        the object that owns the thread dedicated to this pipeline, see `arun`
+        """
+        return self
+
+    async def arun(self, func: Callable[..., T], *args, timeout: Optional[float] = None, **kwargs) -> T:
+        """
+        Run func(*args, **kwargs) in the thread dedicated to this pipeline without blocking the event loop.
+        Concurrent calls are queued and run one after the other, so they can share the loaded model.
+        Raises asyncio.TimeoutError after timeout seconds. On timeout or cancellation a queued call is dropped,
+        but a running call can't be interrupted and finishes in the background.
+        The thread is shut down by `aunload` and started again when it is needed.
+        """
+        executor = get_dedicated_executor(self._executor_owner)
+        return await run_in_executor(executor, func, *args, timeout=timeout, **kwargs)
+
+    async def aforward(
+        self,
+        *input_tensors: xr.DataArray,
+        timeout: Optional[float] = None,
+        sample_measures: Optional[TensorMeasures] = None,
+    ) -> List[xr.DataArray]:
+        """
+        Compute predictions like `forward` without blocking the event loop, see `arun`
+        """
+        return await self.arun(self.forward, *input_tensors, timeout=timeout, sample_measures=sample_measures)
+
+    async def aload(self, timeout: Optional[float] = None) -> None:
+        """
+        load model onto devices like `load` without blocking the event loop, see `arun`
+        """
+        await self.arun(self.load, timeout=timeout)
+
+    async def aunload(self, timeout: Optional[float] = None) -> None:
+        """
+        free any device memory in use like `unload` without blocking the event loop, see `arun`,
+        and shut down the thread dedicated to this pipeline
+        """
+        try:
+            await self.arun(self.unload, timeout=timeout)
+        finally:
+            shutdown_dedicated_executor(self._executor_owner)
+
+    async def __aenter__(self):
+        await self.aload()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aunload()
+        return False
+
 
 class _PredictionPipelineImpl(PredictionPipeline):
     def __init__(
@@ -115,6 +189,12 @@ class _PredictionPipelineImpl(PredictionPipeline):
         self._out_stats = out_stats
         self._model: ModelAdapter = model
 
+    @property
+    def _executor_owner(self) -> ModelAdapter:
+        # share the thread with the model adapter, so that models that are not thread-safe (e.g. tensorflow
+        # sessions) are loaded and run in the same thread, also by `ModelAdapter.aload`
+        return self._model
+
     def __call__(self, *input_tensors: xr.DataArray) -> List[xr.DataArray]:
         return self.forward(*input_tensors)
 
@@ -142,10 +222,19 @@ class _PredictionPipelineImpl(PredictionPipeline):
         """Predict input_tensor with the model without applying pre/postprocessing."""
         return self._model.forward(*input_tensors)
 
-    def apply_preprocessing(self, sample: Sample, computed_measures: ComputedMeasures) -> None:
+    def compute_sample_measures(self, *input_tensors: xr.DataArray) -> TensorMeasures:
+        input_sample = dict(zip([ipt.name for ipt in self.input_specs], input_tensors))
+        return self._ipt_stats.compute_sample_measures(input_sample)
+
+    def apply_preprocessing(
+        self,
+        sample: Sample,
+        computed_measures: ComputedMeasures,
+        sample_measures: Optional[TensorMeasures] = None,
+    ) -> None:
         """apply preprocessing in-place, also updates given computed_measures"""
         self._ipt_stats.update_with_sample(sample)
-        for mode, stats in self._ipt_stats.compute_measures().items():
+        for mode, stats in self._ipt_stats.compute_measures(sample_measures).items():
             if mode not in computed_measures:
                 computed_measures[mode] = {}
             computed_measures[mode].update(stats)
@@ -162,13 +251,15 @@ class _PredictionPipelineImpl(PredictionPipeline):
 
         self._postprocessing.apply(sample, computed_measures)
 
-    def forward(self, *input_tensors: xr.DataArray) -> List[xr.DataArray]:
+    def forward(
+        self, *input_tensors: xr.DataArray, sample_measures: Optional[TensorMeasures] = None
+    ) -> List[xr.DataArray]:
         """Apply preprocessing, run prediction and apply postprocessing.
         Note: The preprocessing might change input_tensors in-pace.
         """
         input_sample = dict(zip([ipt.name for ipt in self.input_specs], input_tensors))
         computed_measures = {}
-        self.apply_preprocessing(input_sample, computed_measures)
+        self.apply_preprocessing(input_sample, computed_measures, sample_measures)
 
         prediction_tensors = self.predict(*list(input_sample.values()))
         prediction = dict(zip([out.name for out in self.output_specs], prediction_tensors))
@@ -192,6 +283,8 @@ def create_prediction_pipeline(
     update_dataset_stats_after_n_samples: Optional[int] = None,
     update_dataset_stats_for_n_samples: int = float("inf"),
     model_adapter: Optional[ModelAdapter] = None,
+    stats_subsample_size: Optional[int] = None,
+    stats_subsample_method: str = "random",
 ) -> PredictionPipeline:
     """
     Creates prediction pipeline which includes:
@@ -200,6 +293,9 @@ def create_prediction_pipeline(
     * model prediction
     * computation of output statistics
     * postprocessing
+
+    With stats_subsample_size the sample statistics are estimated from a subsample of about this many elements
+    per tensor (see StatsState).
     """
     model_adapter: ModelAdapter = model_adapter or create_model_adapter(
         bioimageio_model=bioimageio_model, devices=devices, weight_format=weight_format
@@ -224,6 +320,8 @@ def create_prediction_pipeline(
         dataset=sample_dataset(),
         update_dataset_stats_after_n_samples=update_dataset_stats_after_n_samples,
         update_dataset_stats_for_n_samples=update_dataset_stats_for_n_samples,
+        subsample_size=stats_subsample_size,
+        subsample_method=stats_subsample_method,
     )
     postprocessing = CombinedProcessing(outs)
     out_stats = StatsState(
@@ -231,6 +329,8 @@ def create_prediction_pipeline(
         dataset=tuple(),
         update_dataset_stats_after_n_samples=0,
         update_dataset_stats_for_n_samples=ipt_stats.sample_count + update_dataset_stats_for_n_samples,
+        subsample_size=stats_subsample_size,
+        subsample_method=stats_subsample_method,
     )
 
     return _PredictionPipelineImpl(
@@ -242,3 +342,14 @@ def create_prediction_pipeline(
         ipt_stats=ipt_stats,
         out_stats=out_stats,
     )
+
+
+async def acreate_prediction_pipeline(
+    bioimageio_model: Union[nodes.Model, raw_nodes.Model], *, timeout: Optional[float] = None, **kwargs: Any
+) -> PredictionPipeline:
+    """
+    Creates prediction pipeline like `create_prediction_pipeline` without blocking the event loop.
+    The model is not loaded yet, use the pipeline as async context manager or call `aload`.
+    """
+    # the pipeline does not have its dedicated thread yet, so the loop's default executor is used
+    return await run_in_executor(None, create_prediction_pipeline, bioimageio_model, timeout=timeout, **kwargs)
@@ -1,18 +1,33 @@
 from dataclasses import dataclass, field, fields
-from typing import Mapping, Optional, Sequence, Type, Union
+from typing import Callable, List, Mapping, Optional, Sequence, Tuple, Type, Union
 
 import numpy as np
 import xarray as xr
 
 from bioimageio.core.statistical_measures import Mean, Measure, Percentile, Std
 from bioimageio.spec.model.raw_nodes import PostprocessingName, PreprocessingName
-from ._utils import ComputedMeasures, DatasetMode, FIXED, Mode, PER_DATASET, PER_SAMPLE, RequiredMeasures, SampleMode
+from ._utils import (
+    broadcast_to_dims,
+    ComputedMeasures,
+    DatasetMode,
+    FIXED,
+    Mode,
+    PER_DATASET,
+    PER_SAMPLE,
+    RequiredMeasures,
+    SampleMode,
+)
 
 try:
     from typing import Literal, get_args, TypedDict
 except ImportError:
     from typing_extensions import Literal, get_args, TypedDict  # type: ignore
 
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
+
 
 def _get_fixed(
     fixed: Union[float, Sequence[float]], tensor: xr.DataArray, axes: Optional[Sequence[str]]
@@ -26,8 +41,24 @@ def _get_fixed(
     return xr.DataArray(fixed, dims=fixed_dims)
 
 
+def _broadcastable(value: Union[float, Sequence[float], xr.DataArray], tensor: xr.DataArray) -> np.ndarray:
+    """convert a parameter or measure to a numpy array that broadcasts against the data of tensor"""
+    if isinstance(value, xr.DataArray):
+        return broadcast_to_dims(value, tensor.dims)
+
+    return np.asarray(value)
+
+
+def _as_operand(value: Union[float, Sequence[float], xr.DataArray], tensor: xr.DataArray) -> np.ndarray:
+    """convert a parameter or measure to a float32 array that broadcasts against the data of tensor"""
+    return np.asarray(_broadcastable(value, tensor), dtype="float32")
+
+
 TensorName = str
 
+# an elementwise operation: a numpy ufunc that is applied in-place and its second operand (None for unary ufuncs)
+ElementwiseOp = Tuple[Callable, Optional[np.ndarray]]
+
 MISSING = "MISSING"
 
 
@@ -69,6 +100,12 @@ class Processing:
         """apply processing"""
         raise NotImplementedError
 
+    def get_elementwise_ops(self, tensor: xr.DataArray) -> Optional[List[ElementwiseOp]]:
+        """get the elementwise operations that are equivalent to `apply` for tensor to fuse them with other steps.
+        Returns None if the processing can not be expressed as elementwise operations.
+        """
+        return None
+
     def __post_init__(self):
         # validate common kwargs by their annotations
         for f in fields(self):
@@ -96,6 +133,55 @@ def ensure_dtype(tensor: xr.DataArray, *, dtype) -> xr.DataArray:
     return tensor.astype(dtype)
 
 
+# numexpr expressions of the elementwise operations, where x is the result of the previous operations
+_NUMEXPR_TEMPLATES = {
+    np.add: "({x} + {p})",
+    np.subtract: "({x} - {p})",
+    np.multiply: "({x} * {p})",
+    np.divide: "({x} / {p})",
+    np.maximum: "where({x} < {p}, {p}, {x})",
+    np.minimum: "where({x} > {p}, {p}, {x})",
+    np.greater: "where({x} > {p}, one, zero)",
+    np.negative: "(-{x})",
+    np.exp: "exp({x})",
+    np.reciprocal: "(one / {x})",
+}
+
+
+def apply_elementwise(data: np.ndarray, ops: Sequence[ElementwiseOp]) -> np.ndarray:
+    """
+    Apply elementwise operations in-place to a float32 array.
+    If numexpr is installed and uses several threads, the operations are evaluated in a single parallel pass
+    over the data, otherwise one after another with numpy (which is faster than numexpr on a single thread).
+    """
+    if numexpr is None or numexpr.get_num_threads() < 2 or any(ufunc not in _NUMEXPR_TEMPLATES for ufunc, _ in ops):
+        for ufunc, operand in ops:
+            if operand is None:
+                ufunc(data, out=data)
+            else:
+                ufunc(data, operand, out=data)
+
+        return data
+
+    # the constants are float32, so that numexpr does not promote the expression to float64
+    local_dict = {"x": data, "one": np.float32(1), "zero": np.float32(0)}
+    expr = "x"
+    for i, (ufunc, operand) in enumerate(ops):
+        template = _NUMEXPR_TEMPLATES[ufunc]
+        if template.count("{x}") > 1 and expr != "x":
+            # evaluate the expression so far instead of repeating it in the template
+            numexpr.evaluate(expr, local_dict=local_dict, out=data)
+            expr = "x"
+
+        local_dict[f"p{i}"] = operand
+        expr = template.format(x=expr, p=f"p{i}")
+
+    if expr != "x":
+        numexpr.evaluate(expr, local_dict=local_dict, out=data)
+
+    return data
+
+
 #
 # Pre- and Postprocessing implementations
 #
@@ -108,6 +194,9 @@ class Binarize(Processing):
     def apply(self, tensor: xr.DataArray) -> xr.DataArray:
         return ensure_dtype(tensor > self.threshold, dtype="float32")
 
+    def get_elementwise_ops(self, tensor: xr.DataArray) -> Optional[List[ElementwiseOp]]:
+        return [(np.greater, _as_operand(self.threshold, tensor))]
+
 
 @dataclass
 class Clip(Processing):
@@ -117,6 +206,9 @@ class Clip(Processing):
     def apply(self, tensor: xr.DataArray) -> xr.DataArray:
         return ensure_dtype(tensor.clip(min=self.min, max=self.max), dtype="float32")
 
+    def get_elementwise_ops(self, tensor: xr.DataArray) -> Optional[List[ElementwiseOp]]:
+        return [(np.maximum, _as_operand(self.min, tensor)), (np.minimum, _as_operand(self.max, tensor))]
+
 
 @dataclass
 class EnsureDtype(Processing):
@@ -134,7 +226,7 @@ class ScaleLinear(Processing):
     offset: Union[float, Sequence[float]] = MISSING
     axes: Optional[Sequence[str]] = None
 
-    def apply(self, tensor: xr.DataArray) -> xr.DataArray:
+    def _get_gain_offset(self, tensor: xr.DataArray):
         scale_axes = tuple(ax for ax in tensor.dims if (ax not in self.axes and ax != "b"))
         if scale_axes:
             gain = xr.DataArray(np.atleast_1d(self.gain), dims=scale_axes)
@@ -143,8 +235,16 @@ class ScaleLinear(Processing):
             gain = self.gain
             offset = self.offset
 
+        return gain, offset
+
+    def apply(self, tensor: xr.DataArray) -> xr.DataArray:
+        gain, offset = self._get_gain_offset(tensor)
         return ensure_dtype(tensor * gain + offset, dtype="float32")
 
+    def get_elementwise_ops(self, tensor: xr.DataArray) -> Optional[List[ElementwiseOp]]:
+        gain, offset = self._get_gain_offset(tensor)
+        return [(np.multiply, _as_operand(gain, tensor)), (np.add, _as_operand(offset, tensor))]
+
     def __post_init__(self):
         super().__post_init__()
         if self.axes is None:
@@ -157,6 +257,58 @@ class ScaleMeanVariance(Processing):
     ...
 
 
+@dataclass
+class FusedProcessing(Processing):
+    """
+    The processing steps of a tensor fused into a single elementwise function.
+
+    The tensor is copied to float32 once and the elementwise operations of all steps are applied in-place
+    to this copy, instead of allocating (float64) temporaries for every step.
+    Falls back to applying the steps one after another if any of them is not elementwise.
+    """
+
+    steps: Sequence[Processing] = MISSING
+    dtype: Optional[str] = None  # dtype of the result, float32 if None
+
+    def get_required_measures(self) -> RequiredMeasures:
+        ret: RequiredMeasures = {}
+        for step in self.steps:
+            for mode, ms_per_mode in step.get_required_measures().items():
+                for tn, ms_per_tn in ms_per_mode.items():
+                    ret.setdefault(mode, {}).setdefault(tn, set()).update(ms_per_tn)
+
+        return ret
+
+    def set_computed_measures(self, computed: ComputedMeasures):
+        for step in self.steps:
+            step.set_computed_measures(computed)
+
+        self.computed_measures = computed
+
+    def get_elementwise_ops(self, tensor: xr.DataArray) -> Optional[List[ElementwiseOp]]:
+        ops = []
+        for step in self.steps:
+            step_ops = step.get_elementwise_ops(tensor)
+            if step_ops is None:
+                return None
+
+            ops.extend(step_ops)
+
+        return ops
+
+    def apply(self, tensor: xr.DataArray) -> xr.DataArray:
+        ops = self.get_elementwise_ops(tensor) if self.steps else None
+        if ops is None:
+            for step in self.steps:
+                tensor = step.apply(tensor)
+
+            return tensor if self.dtype is None else ensure_dtype(tensor, dtype=self.dtype)
+
+        # always copy, the preprocessing must not change the input data and the postprocessing not the model output
+        data = apply_elementwise(np.array(tensor.data, dtype="float32"), ops)
+        return tensor.copy(data=data if self.dtype is None else data.astype(self.dtype, copy=False))
+
+
 @dataclass
 class ScaleRange(Processing):
     mode: Literal[SampleMode, DatasetMode] = PER_SAMPLE
@@ -171,14 +323,24 @@ class ScaleRange(Processing):
         measures = {Percentile(self.min_percentile, axes=axes), Percentile(self.max_percentile, axes=axes)}
         return {self.mode: {self.reference_tensor or self.tensor_name: measures}}
 
-    def apply(self, tensor: xr.DataArray) -> xr.DataArray:
+    def _get_lower_upper(self):
         ref_name = self.reference_tensor or self.tensor_name
         axes = None if self.axes is None else tuple(self.axes)
         v_lower = self.get_computed_measure(ref_name, Percentile(self.min_percentile, axes=axes))
         v_upper = self.get_computed_measure(ref_name, Percentile(self.max_percentile, axes=axes))
+        return v_lower, v_upper
 
+    def apply(self, tensor: xr.DataArray) -> xr.DataArray:
+        v_lower, v_upper = self._get_lower_upper()
         return ensure_dtype((tensor - v_lower) / (v_upper - v_lower + self.eps), dtype="float32")
 
+    def get_elementwise_ops(self, tensor: xr.DataArray) -> Optional[List[ElementwiseOp]]:
+        v_lower, v_upper = (_broadcastable(v, tensor) for v in self._get_lower_upper())
+        return [
+            (np.subtract, _as_operand(v_lower, tensor)),
+            (np.divide, _as_operand(v_upper - v_lower + self.eps, tensor)),
+        ]
+
     def __post_init__(self):
         super().__post_init__()
         self.axes = None if self.axes is None else tuple(self.axes)  # make sure axes is Tuple[str] or None
@@ -189,6 +351,9 @@ class Sigmoid(Processing):
     def apply(self, tensor: xr.DataArray) -> xr.DataArray:
         return 1.0 / (1.0 + np.exp(-tensor))
 
+    def get_elementwise_ops(self, tensor: xr.DataArray) -> Optional[List[ElementwiseOp]]:
+        return [(np.negative, None), (np.exp, None), (np.add, _as_operand(1.0, tensor)), (np.reciprocal, None)]
+
 
 @dataclass
 class ZeroMeanUnitVariance(Processing):
@@ -205,7 +370,7 @@ class ZeroMeanUnitVariance(Processing):
             axes = None if self.axes is None else tuple(self.axes)
             return {self.mode: {self.tensor_name: {Mean(axes=axes), Std(axes=axes)}}}
 
-    def apply(self, tensor: xr.DataArray) -> xr.DataArray:
+    def _get_mean_std(self, tensor: xr.DataArray):
         axes = None if self.axes is None else tuple(self.axes)
         if self.mode == FIXED:
             assert self.mean is not None and self.std is not None
@@ -218,9 +383,17 @@ class ZeroMeanUnitVariance(Processing):
         else:
             raise ValueError(self.mode)
 
+        return mean, std
+
+    def apply(self, tensor: xr.DataArray) -> xr.DataArray:
+        mean, std = self._get_mean_std(tensor)
         tensor = (tensor - mean) / (std + self.eps)
         return ensure_dtype(tensor, dtype="float32")
 
+    def get_elementwise_ops(self, tensor: xr.DataArray) -> Optional[List[ElementwiseOp]]:
+        mean, std = (_broadcastable(v, tensor) for v in self._get_mean_std(tensor))
+        return [(np.subtract, _as_operand(mean, tensor)), (np.divide, _as_operand(std + self.eps, tensor))]
+
 
 _KnownProcessing = TypedDict(
     "_KnownProcessing",
@@ -1,10 +1,10 @@
-from typing import Dict, Iterable, Optional
+from typing import Dict, Iterable, Optional, Set
 
 from tqdm import tqdm
 
 from bioimageio.core.statistical_measures import Measure
-from ._measure_groups import MeasureGroups, MeasureValue, get_measure_groups
-from ._utils import ComputedMeasures, PER_DATASET, PER_SAMPLE, RequiredMeasures, Sample, TensorName
+from ._measure_groups import MeasureGroups, MeasureValue, estimate_standard_errors, get_measure_groups, subsample
+from ._utils import ComputedMeasures, PER_DATASET, PER_SAMPLE, RequiredMeasures, Sample, TensorMeasures, TensorName
 
 try:
     from typing import Literal
@@ -20,7 +20,7 @@ class StatsState:
     measure_groups: MeasureGroups
     _n_start: int
     _n_stop: int
-    _final_dataset_stats: Optional[Dict[TensorName, Dict[Measure, MeasureValue]]]
+    _final_dataset_stats: Optional[TensorMeasures]
 
     def __init__(
         self,
@@ -29,6 +29,8 @@ class StatsState:
         dataset: Iterable[Sample] = tuple(),
         update_dataset_stats_after_n_samples: Optional[int] = None,
         update_dataset_stats_for_n_samples: int = float("inf"),
+        subsample_size: Optional[int] = None,
+        subsample_method: Literal["random", "strided"] = "random",
     ):
         """iterates over dataset to compute dataset statistics (if required). The resulting dataset statistics are further updated with each new sample. A sample in this context may be a mini-batch.
 
@@ -41,10 +43,29 @@ class StatsState:
                                                   samples to count twice if they make up the given 'dataset'.
             update_dataset_stats_for_n_samples: stop updating dataset statistics with new samples S_i if
                                                 i > for_n_samples (+ update_dataset_stats_after_n_samples)
+            subsample_size: estimate the sample statistics from a subsample of about this many elements per tensor
+                            instead of computing them exactly (default: None, i.e. exact statistics).
+                            The estimated standard errors are added to the sample statistics
+                            as StandardError(measure).
+            subsample_method: 'random' draws the subsample uniformly, 'strided' takes every n-th element, which is
+                              cheaper, but the standard errors assume a random subsample.
         """
         self.required_measures = required_measures
         self.update_dataset_stats_after_n_samples = update_dataset_stats_after_n_samples
         self.update_dataset_stats_for_n_samples = update_dataset_stats_for_n_samples
+        self.subsample_size = subsample_size
+        self.subsample_method = subsample_method
+        # only axes reduced by all sample measures of a tensor can be subsampled
+        self._subsample_axes: Dict[TensorName, Set[str]] = {}
+        for tn, measures in required_measures.get(PER_SAMPLE, {}).items():
+            axes = None
+            for m in measures:
+                m_axes = getattr(m, "axes", None)
+                if m_axes is not None:
+                    axes = set(m_axes) if axes is None else axes & set(m_axes)
+
+            self._subsample_axes[tn] = axes
+
         self.reset(dataset)
 
     def reset(self, dataset: Iterable[Sample]):
@@ -76,16 +97,49 @@ class StatsState:
         for mg in self.measure_groups[PER_DATASET]:
             mg.update_with_sample(sample)
 
-    def compute_measures(self) -> ComputedMeasures:
+    def compute_sample_measures(self, sample: Sample) -> TensorMeasures:
+        """compute the sample statistics of the given sample without updating the state"""
+        if self.subsample_size is not None:
+            sample = {
+                tn: subsample(
+                    t,
+                    t.dims if self._subsample_axes.get(tn) is None else self._subsample_axes[tn],
+                    self.subsample_size,
+                    self.subsample_method,
+                )
+                for tn, t in sample.items()
+            }
+
+        ret = {}
+        for mg in self.measure_groups[PER_SAMPLE]:
+            # several groups may compute measures of the same tensor
+            for tn, vals in mg.compute(sample).items():
+                ret.setdefault(tn, {}).update(vals)
+
+        if self.subsample_size is not None:
+            for tn, measures in ret.items():
+                measures.update(estimate_standard_errors(sample[tn], measures))
+
+        return ret
+
+    def compute_measures(self, sample_measures: Optional[TensorMeasures] = None) -> ComputedMeasures:
+        """compute the statistics of the last sample and the dataset statistics
+
+        Args:
+            sample_measures: sample statistics to use instead of computing them for the last sample,
+                e.g. the statistics of a whole image for one of its tiles
+        """
         ret = {PER_SAMPLE: {}, PER_DATASET: {}}
-        if self.last_sample is not None:
-            for mg in self.measure_groups[PER_SAMPLE]:
-                ret[PER_SAMPLE].update(mg.compute(self.last_sample))
+        if sample_measures is not None:
+            ret[PER_SAMPLE].update(sample_measures)
+        elif self.last_sample is not None:
+            ret[PER_SAMPLE].update(self.compute_sample_measures(self.last_sample))
 
         if self._final_dataset_stats is None:
             dataset_stats = {}
             for mg in self.measure_groups[PER_DATASET]:
-                dataset_stats.update(mg.finalize())
+                for tn, vals in mg.finalize().items():
+                    dataset_stats.setdefault(tn, {}).update(vals)
 
             if self.sample_count > self._n_stop:
                 # stop recomputing final dataset statistics
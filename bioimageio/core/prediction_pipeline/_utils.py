@@ -1,5 +1,10 @@
-from typing import Dict, Set
+import asyncio
+import functools
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Sequence, Set, TypeVar
 
+import numpy as np
 import xarray as xr
 
 from bioimageio.core.statistical_measures import Measure, MeasureValue
@@ -22,4 +27,56 @@ MODES: Set[Mode] = {FIXED, PER_SAMPLE, PER_DATASET}
 
 Sample = Dict[TensorName, xr.DataArray]
 RequiredMeasures = Dict[Literal[SampleMode, DatasetMode], Dict[TensorName, Set[Measure]]]
-ComputedMeasures = Dict[Literal[SampleMode, DatasetMode], Dict[TensorName, Dict[Measure, MeasureValue]]]
+TensorMeasures = Dict[TensorName, Dict[Measure, MeasureValue]]
+ComputedMeasures = Dict[Literal[SampleMode, DatasetMode], TensorMeasures]
+
+
+def broadcast_to_dims(tensor: xr.DataArray, dims: Sequence[str]) -> np.ndarray:
+    """view of the data of tensor that broadcasts against a numpy array with the given dims,
+    which include all dims of tensor; avoids xarray's broadcasting by name, which costs more than
+    the actual computation for small tensors"""
+    if any(d not in dims for d in tensor.dims):
+        raise ValueError(f"Can not broadcast axes {tensor.dims} to {dims}")
+    data = np.asarray(tensor.data).transpose([tensor.dims.index(d) for d in dims if d in tensor.dims])
+    return np.expand_dims(data, tuple(i for i, d in enumerate(dims) if d not in tensor.dims))
+
+
+T = TypeVar("T")
+
+_executor_lock = threading.Lock()
+
+
+def get_dedicated_executor(obj: Any) -> ThreadPoolExecutor:
+    """get the single thread executor that runs the (framework) calls of obj, e.g. of a model adapter,
+    so that concurrent async calls are serialized instead of running the model from several threads"""
+    with _executor_lock:
+        executor = getattr(obj, "_dedicated_executor", None)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"bioimageio-{type(obj).__name__}")
+            obj._dedicated_executor = executor
+
+    return executor
+
+
+def shutdown_dedicated_executor(obj: Any) -> None:
+    """shut down the dedicated executor of obj (if it has one) once its pending calls are done;
+    a new executor is created if obj needs one again"""
+    with _executor_lock:
+        executor = getattr(obj, "_dedicated_executor", None)
+        obj._dedicated_executor = None
+
+    if executor is not None:
+        executor.shutdown(wait=False)
+
+
+async def run_in_executor(
+    executor: Optional[Executor], func: Callable[..., T], *args, timeout: Optional[float] = None, **kwargs
+) -> T:
+    """Run func in the executor (or the default executor of the event loop) without blocking the event loop.
+
+    Raises asyncio.TimeoutError if func does not finish within timeout seconds. On timeout or cancellation a call
+    that did not start yet is dropped, but a call that already started can't be interrupted and finishes in the
+    background.
+    """
+    loop = asyncio.get_running_loop()
+    return await asyncio.wait_for(loop.run_in_executor(executor, functools.partial(func, *args, **kwargs)), timeout)
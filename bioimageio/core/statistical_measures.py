@@ -1,12 +1,109 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional, Tuple
+from typing import Optional, Sequence, Tuple
 
+import numpy as np
 import xarray as xr
 
 MeasureValue = xr.DataArray
 
+# max. number of elements that are copied at once to compute quantiles, to bound the extra memory
+_QUANTILE_CHUNK_SIZE = 1 << 20
+
+
+def _histogram_quantiles(data: np.ndarray, qs: Sequence[float], vmin: int, span: int) -> np.ndarray:
+    """exact quantiles of each row of a 2d integer array with values in [vmin, vmin + span) from the value counts"""
+    n_groups, n = data.shape
+    counts = np.zeros((n_groups, span), dtype=np.int64)
+    rows = max(1, _QUANTILE_CHUNK_SIZE // n)
+    cols = min(n, _QUANTILE_CHUNK_SIZE)
+    for r0 in range(0, n_groups, rows):
+        n_rows = min(rows, n_groups - r0)
+        # count the values of several rows with one bincount by shifting each row to its own range of bins
+        offsets = (np.arange(n_rows) * span - vmin)[:, None]
+        for c0 in range(0, n, cols):
+            idx = data[r0 : r0 + n_rows, c0 : c0 + cols].astype(np.intp)
+            idx += offsets
+            counts[r0 : r0 + n_rows] += np.bincount(idx.ravel(), minlength=n_rows * span).reshape(n_rows, span)
+
+    # the cumulative counts of all rows shifted to one increasing sequence, to look up all rows at once
+    row_offsets = np.arange(n_groups) * n
+    cumulative = (np.cumsum(counts, axis=1) + row_offsets[:, None]).ravel()
+    bin_offsets = np.arange(n_groups) * span - vmin
+
+    def get_sorted(k: int) -> np.ndarray:
+        """the k-th smallest value of each row"""
+        return np.searchsorted(cumulative, row_offsets + k, side="right") - bin_offsets
+
+    ret = []
+    for q in qs:
+        # linear interpolation between the closest ranks like np.quantile
+        h = (n - 1) * q
+        lo = int(np.floor(h))
+        v_lo = get_sorted(lo).astype(np.float64)
+        v_hi = get_sorted(min(lo + 1, n - 1))
+        ret.append(v_lo + (h - lo) * (v_hi - v_lo))
+
+    return np.stack(ret)
+
+
+def _partition_quantiles(data: np.ndarray, qs: Sequence[float]) -> np.ndarray:
+    """quantiles of each row of a 2d array with a single partial sort for all quantiles"""
+    n_groups, n = data.shape
+    hs = [(n - 1) * q for q in qs]
+    kth = sorted({min(int(np.floor(h)) + i, n - 1) for h in hs for i in (0, 1)})
+    ret = np.empty((len(qs), n_groups))
+    rows = max(1, _QUANTILE_CHUNK_SIZE // n)
+    for r0 in range(0, n_groups, rows):
+        # partition a copy of a few rows at a time
+        block = np.partition(data[r0 : r0 + rows], kth, axis=1)
+        for i, h in enumerate(hs):
+            lo = int(np.floor(h))
+            v_lo = block[:, lo].astype(np.float64)
+            v_hi = block[:, min(lo + 1, n - 1)].astype(np.float64)
+            ret[i, r0 : r0 + rows] = v_lo + (h - lo) * (v_hi - v_lo)
+
+        del block  # free the copy before partitioning the next rows
+
+    return ret
+
+
+def compute_quantiles(tensor: xr.DataArray, qs: Sequence[float], axes: Optional[Sequence[str]]) -> xr.DataArray:
+    """Compute quantiles like tensor.quantile(qs, dim=axes), but without sorting the data.
+
+    The quantiles of integer tensors are computed exactly from the counts of their values in linear time;
+    float tensors are partially sorted once for all quantiles. Dask backed tensors and floats with NaN values
+    are passed on to xarray.
+    """
+    data = tensor.data
+    if tensor.chunks is not None or data.size == 0 or data.dtype.kind not in "iuf":
+        return tensor.quantile(qs, dim=axes)
+
+    if data.dtype.kind == "f" and np.isnan(data.min()):  # xarray skips NaN values
+        return tensor.quantile(qs, dim=axes)
+
+    axes = tensor.dims if axes is None else tuple(axes)
+    dims = [d for d in tensor.dims if d not in axes]
+    order = [tensor.dims.index(d) for d in dims + list(axes)]
+    data = data.transpose(order).reshape(int(np.prod([tensor.sizes[d] for d in dims])), -1)
+    values = None
+    if data.dtype.kind in "iu" and data.dtype != np.uint64:  # uint64 values may not fit the bin indices
+        vmin = int(data.min())
+        span = int(data.max()) - vmin + 1
+        # counting the values needs one bin per value in the range of the data, use it for small ranges only
+        if span * data.shape[0] <= max(data.size, 1 << 16):
+            values = _histogram_quantiles(data, qs, vmin, span)
+
+    if values is None:
+        values = _partition_quantiles(data, qs)
+
+    return xr.DataArray(
+        values.reshape((len(qs),) + tuple(tensor.sizes[d] for d in dims)),
+        dims=("quantile",) + tuple(dims),
+        coords={"quantile": list(qs)},
+    )
+
 
 @dataclass(frozen=True)
 class Measure:
@@ -49,4 +146,11 @@ class Percentile(Measure):
         assert self.n <= 100
 
     def compute(self, tensor: xr.DataArray) -> xr.DataArray:
-        return tensor.quantile(self.n / 100.0, dim=self.axes)
+        return compute_quantiles(tensor, [self.n / 100.0], self.axes).isel(quantile=0)
+
+
+@dataclass(frozen=True)
+class StandardError(Measure):
+    """standard error of a measure that is estimated from a subsample of a tensor"""
+
+    measure: Measure
@@ -41,6 +41,11 @@ setup(
         "pytorch": ["pytorch>=1.6", "torchvision", "cudatoolkit>=10.1"],
         "tensorflow": ["tensorflow"],
         "onnx": ["onnxruntime"],
+        "dask": ["dask[array]"],
+        "zarr": ["zarr"],
+        "hdf5": ["h5py>=3"],
+        "numexpr": ["numexpr"],
+        "threadpoolctl": ["threadpoolctl"],
     },
     project_urls={  # Optional
         "Bug Reports": "https://github.com/bioimage-io/core-bioimage-io-python/issues",
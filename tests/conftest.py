@@ -215,6 +215,12 @@ def unet2d_expand_output_shape(request):
     return pytest.model_packages[request.param]
 
 
+# written as model group to automatically skip on missing torch
+@pytest.fixture(params=[] if skip_torch else ["unet2d_multi_tensor"])
+def unet2d_multi_tensor(request):
+    return pytest.model_packages[request.param]
+
+
 # written as model group to automatically skip on missing torch
 @pytest.fixture(params=[] if skip_torch else ["unet2d_fixed_shape"])
 def unet2d_fixed_shape(request):
@@ -32,3 +32,41 @@ def test_postprocessing_dtype():
         res = sample["out1"]
         assert np.dtype(res.dtype) == np.dtype(dtype)
         xr.testing.assert_allclose(res, exp.astype(dtype))
+
+
+def test_fused_processing():
+    from bioimageio.core.prediction_pipeline._measure_groups import compute_measures
+    from bioimageio.core.prediction_pipeline._processing import (
+        Clip,
+        FusedProcessing,
+        ScaleLinear,
+        ScaleRange,
+        Sigmoid,
+        ZeroMeanUnitVariance,
+    )
+
+    def get_steps():
+        return [
+            ScaleRange("data_name", axes=("x", "y"), min_percentile=1.0, max_percentile=99.0),
+            ZeroMeanUnitVariance("data_name", mode="fixed", axes=("b", "x", "y"), mean=[0.1, 0.2], std=[1.0, 2.0]),
+            ScaleLinear("data_name", gain=[1.0, 2.0], offset=[0.0, 1.0], axes="xy"),
+            Clip("data_name", min=-1.0, max=1.5),
+            Sigmoid("data_name"),
+        ]
+
+    np_data = np.random.randint(0, 1000, size=(1, 2, 32, 32)).astype("uint16")
+    data = xr.DataArray(np_data.copy(), dims=("b", "c", "y", "x"))
+    fused = FusedProcessing("data_name", steps=get_steps(), dtype="float32")
+    computed = compute_measures(fused.get_required_measures(), sample={"data_name": data})
+    fused.set_computed_measures(computed)
+
+    expected = data
+    for step in get_steps():
+        step.set_computed_measures(computed)
+        expected = step.apply(expected)
+
+    result = fused.apply(data)
+    assert result.dtype == np.dtype("float32")
+    assert result.dims == expected.dims
+    np.testing.assert_allclose(result.values, expected.values, rtol=1e-5)
+    np.testing.assert_array_equal(data.values, np_data)  # the input is not changed
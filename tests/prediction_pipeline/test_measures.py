@@ -9,7 +9,7 @@ import xarray as xr
 from bioimageio.core import statistical_measures
 from bioimageio.core.prediction_pipeline._measure_groups import get_measure_groups
 from bioimageio.core.prediction_pipeline._utils import PER_DATASET, PER_SAMPLE
-from bioimageio.core.statistical_measures import Mean, Percentile, Std, Var
+from bioimageio.core.statistical_measures import Mean, Percentile, StandardError, Std, Var
 
 
 @pytest.mark.parametrize("name_axes", product(["mean", "var", "std"], [None, ("x", "y")]))
@@ -101,3 +101,123 @@ def test_measure_groups(measures_mode):
     for k in expected.keys():
         assert k in actual
         numpy.testing.assert_array_almost_equal(expected[k].data, actual[k].data, decimal=2)
+
+
+@pytest.mark.parametrize(
+    "measures_mode",
+    product(
+        [
+            {"t1": {Mean(), Std(axes=("x", "y"))}, "t2": {Mean(axes=("x", "y"))}},
+            {"t1": {Percentile(n=10), Percentile(n=50, axes=("x", "y"))}},
+        ],
+        [PER_SAMPLE, PER_DATASET],
+    ),
+)
+def test_measure_groups_dask(measures_mode):
+    da = pytest.importorskip("dask.array")
+    measures, mode = measures_mode
+
+    dataset = [
+        {
+            "t1": xr.DataArray(np.random.random((2, 50, 60, 3)), dims=("b", "x", "y", "c")),
+            "t2": xr.DataArray(np.random.random((1, 50, 60)), dims=("c", "x", "y")),
+        }
+        for _ in range(2)
+    ]
+    dask_dataset = [
+        {tn: xr.DataArray(da.from_array(t.data, chunks=16), dims=t.dims) for tn, t in sample.items()}
+        for sample in dataset
+    ]
+
+    def compute(samples):
+        ret = {}
+        for g in get_measure_groups({mode: measures})[mode]:
+            if mode == PER_SAMPLE:
+                res = g.compute(samples[0])
+            else:
+                for s in samples:
+                    g.update_with_sample(s)
+                res = g.finalize()
+
+            for tn, vs in res.items():
+                for m, v in vs.items():
+                    ret[(tn, m)] = v
+
+        return ret
+
+    expected = compute(dataset)
+    actual = compute(dask_dataset)
+    assert expected.keys() == actual.keys()
+    for k, v in actual.items():
+        assert v.chunks is None  # dask results are computed
+        numpy.testing.assert_array_almost_equal(expected[k].data, v.data, decimal=6)
+
+
+def test_measure_groups_per_mode():
+    groups = get_measure_groups(
+        {PER_SAMPLE: {"t1": {Mean(), Std()}, "t2": {Percentile(n=10)}}, PER_DATASET: {"t1": {Mean(axes=("x",))}}}
+    )
+    # per sample measures do not add groups that are updated with every sample for the dataset statistics
+    assert len(groups[PER_SAMPLE]) == 2
+    assert len(groups[PER_DATASET]) == 1
+
+
+def test_broadcast_to_dims():
+    from bioimageio.core.prediction_pipeline._utils import broadcast_to_dims
+
+    mean = xr.DataArray(np.random.random((2, 3)), dims=("c", "x"))
+    broadcastable = broadcast_to_dims(mean, ("b", "x", "y", "c"))
+    assert broadcastable.shape == (1, 3, 1, 2)
+    assert np.shares_memory(broadcastable, mean.data)
+    np.testing.assert_array_equal(broadcastable[0, :, 0, :], mean.data.T)
+    with pytest.raises(ValueError):
+        broadcast_to_dims(mean, ("y", "x"))
+
+
+@pytest.mark.parametrize("dtype_axes", product(["uint8", "uint16", "int32", "float32"], [None, ("x", "y"), ("c",)]))
+def test_compute_quantiles(dtype_axes):
+    from bioimageio.core.statistical_measures import compute_quantiles
+
+    dtype, axes = dtype_axes
+    data = xr.DataArray((np.random.random((2, 3, 40, 50)) * 1000 - 100).astype(dtype), dims=("b", "c", "y", "x"))
+    qs = [0.0, 0.01, 0.5, 0.997, 1.0]
+
+    expected = data.quantile(qs, dim=axes)
+    actual = compute_quantiles(data, qs, axes)
+    assert actual.dtype == expected.dtype
+    # numpy interpolates float32 data in float32, compute_quantiles in float64
+    xr.testing.assert_allclose(expected, actual, atol=1e-3)
+
+
+@pytest.mark.parametrize("method", ["random", "strided"])
+def test_stats_state_subsample(method):
+    from bioimageio.core.prediction_pipeline._stat_state import StatsState
+
+    data = xr.DataArray(np.random.default_rng(0).normal(3.0, 2.0, size=(1, 2, 256, 256)), dims=("b", "c", "y", "x"))
+    measures = [Mean(axes=("y", "x")), Std(axes=("y", "x")), Var(axes=None), Percentile(n=90, axes=("y", "x"))]
+    required = {PER_SAMPLE: {"t": set(measures)}}
+    exact = StatsState(required).compute_sample_measures({"t": data})["t"]
+    approx = StatsState(required, subsample_size=4096, subsample_method=method).compute_sample_measures({"t": data})
+    approx = approx["t"]
+
+    for m in measures:
+        error = approx[StandardError(m)]
+        assert error.dims == exact[m].dims
+        assert (error > 0).all()
+        assert (abs(approx[m] - exact[m]) < 5 * error).all(), m
+
+
+@pytest.mark.parametrize("mode", [PER_SAMPLE, PER_DATASET])
+def test_measures_of_one_tensor_from_several_groups(mode):
+    from bioimageio.core.prediction_pipeline._measure_groups import compute_measures
+    from bioimageio.core.prediction_pipeline._stat_state import StatsState
+
+    data = xr.DataArray(np.random.random((1, 2, 30, 40)), dims=("b", "c", "y", "x"))
+    measures = {Mean(axes=("y", "x")), Var(axes=None), Percentile(n=10)}
+    required = {mode: {"t": measures}}
+    assert len(get_measure_groups(required)[mode]) > 1
+
+    state = StatsState(required)
+    state.update_with_sample({"t": data})
+    for computed in (compute_measures(required, sample={"t": data}, dataset=[{"t": data}]), state.compute_measures()):
+        assert set(computed[mode]["t"]) >= measures
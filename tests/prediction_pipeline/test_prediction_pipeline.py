@@ -48,3 +48,26 @@ def test_prediction_pipeline_tensorflow(any_tensorflow_model):
 
 def test_prediction_pipeline_keras(any_keras_model):
     _test_prediction_pipeline(any_keras_model, "keras_hdf5")
+
+
+def test_prediction_pipeline_async(any_torch_model):
+    import asyncio
+    from bioimageio.core.prediction_pipeline import acreate_prediction_pipeline
+
+    bio_model = load_resource_description(any_torch_model)
+    assert isinstance(bio_model, Model)
+    inputs = [
+        xr.DataArray(np.load(str(test_tensor)), dims=tuple(spec.axes))
+        for test_tensor, spec in zip(bio_model.test_inputs, bio_model.inputs)
+    ]
+    expected_outputs = [np.load(str(test_tensor)) for test_tensor in bio_model.test_outputs]
+
+    async def predict_concurrently():
+        pp = await acreate_prediction_pipeline(bio_model, weight_format="pytorch_state_dict")
+        async with pp:
+            return await asyncio.gather(*[pp.aforward(*inputs, timeout=60) for _ in range(3)])
+
+    for outputs in asyncio.run(predict_concurrently()):
+        assert len(outputs) == len(expected_outputs)
+        for out, exp in zip(outputs, expected_outputs):
+            assert_array_almost_equal(out, exp, decimal=4)
@@ -117,6 +117,20 @@ def test_cli_predict_images_with_weight_format(unet2d_nuclei_broad_model, tmp_pa
     _test_cli_predict_images(unet2d_nuclei_broad_model, tmp_path, ["--weight-format", "pytorch_state_dict"])
 
 
+def test_cli_predict_images_with_num_workers(unet2d_nuclei_broad_model, tmp_path):
+    _test_cli_predict_images(unet2d_nuclei_broad_model, tmp_path, ["--num-workers", "2"])
+
+
+def test_cli_predict_images_output_path():
+    from bioimageio.core.__main__ import _get_output_path
+
+    assert _get_output_path("data/im.tif", "out", "", None) == os.path.join("out", "im.tif")
+    assert _get_output_path("data/im.tif", "out", "", ".npy") == os.path.join("out", "im.npy")
+    # the extension applies to the output container, not to the dataset in it
+    assert _get_output_path("data/im.zarr", "out", "raw", ".h5") == os.path.join("out", "im.h5") + "/raw"
+    assert _get_output_path("data/im.tif", "out.zarr", "", ".zarr") == os.path.join("out.zarr", "im.tif")
+
+
 def test_torch_to_torchscript(unet2d_nuclei_broad_model, tmp_path):
     out_path = tmp_path.with_suffix(".pt")
     ret = run_subprocess(
@@ -1,4 +1,5 @@
 import numpy as np
+import pytest
 
 
 def test_transform_input_image():
@@ -27,3 +28,158 @@ def test_transform_output_tensor():
     for out_axes in out_ax_list:
         out = transform_output_tensor(tensor, tensor_axes, out_axes)
         assert out.ndim == len(out_axes)
+
+
+def test_pad_into():
+    from bioimageio.core.image_helper import BufferPool, pad_into
+
+    im = np.random.rand(5, 7, 3)
+    pool = BufferPool()
+    for mode in ("symmetric", "reflect"):
+        for pad_width in [[(2, 3), (0, 4), (1, 0)], [(0, 0), (6, 1), (2, 2)], [(4, 4), (3, 3), (0, 0)]]:
+            expected = np.pad(im, pad_width, mode=mode)
+            out = pad_into(pool.get(expected.shape, im.dtype), im, pad_width, mode=mode)
+            assert np.array_equal(out, expected)
+            pool.release(out)
+            assert pool.get(expected.shape, im.dtype) is out
+
+
+def test_load_image_mmap(tmp_path):
+    from bioimageio.core.image_helper import load_image, open_output
+
+    path = tmp_path / "im.npy"
+    im = np.random.rand(1, 1, 64, 64).astype("float32")
+    np.save(path, im)
+    loaded = load_image(path, tuple("bcyx"), mmap=True)
+    assert loaded.dims == tuple("bcyx")
+    assert not loaded.data.flags.writeable  # read-only memory map
+    assert np.array_equal(loaded, im)
+
+    out_path = tmp_path / "out.npy"
+    out = open_output(out_path, im.shape, "float32", tuple("bcyx"))
+    out[..., :32, :] = im[..., :32, :]
+    out.flush()
+    res = np.load(out_path)
+    assert np.array_equal(res[..., :32, :], im[..., :32, :])
+    assert (res[..., 32:, :] == 0).all()
+
+
+def test_tiff_array(tmp_path):
+    import tifffile
+    from bioimageio.core.image_helper import TiffArray, load_image, open_image
+
+    axes = tuple("bczyx")
+    vol = np.random.randint(0, 2**16, size=(8, 32, 48)).astype("uint16")
+    compressed_path = tmp_path / "compressed.tif"
+    tifffile.imwrite(compressed_path, vol, compression="zlib")
+    uncompressed_path = tmp_path / "uncompressed.tif"
+    tifffile.imwrite(uncompressed_path, vol)
+
+    lazy = open_image(compressed_path, axes)
+    assert isinstance(lazy, TiffArray)
+    assert lazy.shape == (1, 1) + vol.shape
+    expected = load_image(compressed_path, axes).values
+    assert np.array_equal(np.asarray(lazy), expected)
+    key = (slice(None), slice(0, 1), slice(2, 5), slice(4, 20), slice(10, 48))
+    assert np.array_equal(lazy[key], expected[key])
+
+    # the tiff file is kept open for reading until the array is closed
+    with open_image(compressed_path, axes) as lazy:
+        assert np.array_equal(lazy[key], expected[key])
+        assert not lazy._tif.filehandle.closed
+    assert lazy._tif.filehandle.closed
+
+    # uncompressed tiff files are memory mapped instead
+    mapped = open_image(uncompressed_path, axes)
+    assert not mapped.data.flags.writeable
+    assert np.array_equal(mapped, expected)
+
+
+def test_split_dataset_path():
+    from bioimageio.core.image_helper import split_dataset_path
+
+    assert split_dataset_path("data/im.tif") is None
+    assert split_dataset_path("data/im.zarr/raw/s0")[1:] == ("data/im.zarr", "raw/s0")
+    assert split_dataset_path("data/im.n5/raw")[1:] == ("data/im.n5", "raw")
+    assert split_dataset_path("data/im.h5:/volume")[1:] == ("data/im.h5", "volume")
+
+
+@pytest.mark.parametrize("container", ["im.zarr", "im.h5"])
+def test_load_and_save_dataset(tmp_path, container):
+    pytest.importorskip("zarr" if container.endswith(".zarr") else "h5py")
+    from bioimageio.core.image_helper import DatasetArray, load_image, open_image, open_output, save_image
+
+    axes = tuple("bczyx")
+    vol = np.random.rand(8, 32, 48).astype("float32")
+    path = str(tmp_path / container) + "/raw"
+    dataset = open_output(path, vol.shape, vol.dtype, "zyx", chunks=(4, 16, 16))
+    dataset[...] = vol
+
+    lazy = open_image(path, axes)
+    assert isinstance(lazy, DatasetArray)
+    assert lazy.shape == (1, 1) + vol.shape
+    assert lazy.dataset.chunks == (4, 16, 16)
+    key = (slice(None), slice(None), slice(2, 5), slice(4, 20), slice(10, 48))
+    assert np.array_equal(lazy[key][0, 0], vol[key[2:]])
+
+    loaded = load_image(path, axes)
+    assert np.array_equal(loaded[0, 0], vol)
+    out_path = str(tmp_path / container) + "/out"
+    save_image(out_path, loaded)
+    assert np.array_equal(load_image(out_path, axes), loaded)
+
+
+@pytest.mark.parametrize("n_scales", [1, 2])
+def test_close_h5_dataset(tmp_path, n_scales):
+    h5py = pytest.importorskip("h5py")
+    from bioimageio.core.image_helper import close_output, open_image, open_output
+
+    path = str(tmp_path / "im.h5") + "/raw"
+    out = open_output(path, (1, 1, 16, 16), "float32", "bcyx", n_scales=n_scales)
+    out[...] = 1
+    close_output(path, out)
+
+    with open_image(path if n_scales == 1 else path + "/0", "bcyx") as lazy:
+        assert lazy[()].sum() == 256
+
+    # the file is released, although the datasets are still referenced
+    h5py.File(tmp_path / "im.h5", "w").close()
+
+
+@pytest.mark.parametrize("multichannel", ["split", "imagej", "ome"])
+def test_save_image_multichannel(tmp_path, multichannel):
+    import tifffile
+    from xarray import DataArray
+    from bioimageio.core.image_helper import save_image
+
+    image = DataArray(np.random.rand(1, 6, 8, 32, 32).astype("float32"), dims=tuple("bczyx"))
+    out_path = tmp_path / "out.tif"
+    save_image(out_path, image, multichannel=multichannel, compression="zlib", num_threads=2)
+
+    if multichannel == "split":
+        for c in range(6):
+            assert np.array_equal(tifffile.imread(tmp_path / f"out-c{c}.tif"), image[0, c])
+    else:
+        with tifffile.TiffFile(out_path) as f:
+            assert f.series[0].axes == "ZCYX"
+            assert np.array_equal(f.asarray(), image[0].transpose("z", "c", "y", "x"))
+
+
+def test_multiscale_output(tmp_path):
+    zarr = pytest.importorskip("zarr")
+    from bioimageio.core.image_helper import MultiscaleOutput
+
+    image = np.random.rand(1, 1, 64, 96).astype("float32")
+    out = MultiscaleOutput(str(tmp_path / "out.zarr") + "/pred", image.shape, image.dtype, "bcyx", n_scales=3)
+    # write tiles whose borders are not aligned with the downsampling blocks
+    for y0 in (30, 0):
+        for x0 in (50, 0, 75, 25):
+            tile = (slice(None), slice(None), slice(y0, y0 + 34 if y0 else 30), slice(x0, x0 + 25))
+            out[tile] = image[tile]
+
+    group = zarr.open_group(str(tmp_path / "out.zarr"), mode="r")["pred"]
+    assert [ds["path"] for ds in group.attrs["multiscales"][0]["datasets"]] == ["0", "1", "2"]
+    for level in range(3):
+        f = 2**level
+        expected = image.reshape(1, 1, 64 // f, f, 96 // f, f).mean(axis=(3, 5))
+        np.testing.assert_allclose(group[str(level)][:], expected, rtol=1e-6)
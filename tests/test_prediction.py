@@ -2,12 +2,80 @@ from pathlib import Path
 
 import imageio
 import numpy as np
+import pytest
 from numpy.testing import assert_array_almost_equal
 
 from bioimageio.core import load_resource_description
+from bioimageio.core.prediction_pipeline._model_adapters import ModelAdapter
+from bioimageio.core.resource_io import nodes
 from bioimageio.core.resource_io.nodes import Model
 
 
+class _StubModelAdapter(ModelAdapter):
+    """applies a numpy function to the inputs, to test the prediction functions without a deep learning framework"""
+
+    def __init__(self, *, bioimageio_model, func):
+        super().__init__(bioimageio_model=bioimageio_model)
+        self.func = func
+
+    def _load(self, *, devices=None):
+        pass
+
+    def _forward(self, *input_tensors):
+        import xarray as xr
+
+        results = self.func(*[t.values for t in input_tensors])
+        return [xr.DataArray(res, dims=tuple(out.axes)) for res, out in zip(results, self.bioimageio_model.outputs)]
+
+    def _unload(self):
+        pass
+
+
+def _create_stub_model(halo=None, output_axes=("b", "c", "y", "x")):
+    """create a model with one bcyx input and output of the same shape, which has no weights"""
+    import dataclasses
+
+    from marshmallow import missing
+
+    ipt = nodes.InputTensor(
+        name="input0",
+        data_type="float32",
+        axes=("b", "c", "y", "x"),
+        shape=nodes.ParametrizedInputShape(min=[1, 1, 32, 32], step=[1, 0, 16, 16]),
+    )
+    out = nodes.OutputTensor(
+        name="output0",
+        data_type="float32",
+        axes=tuple(output_axes),
+        shape=nodes.ImplicitOutputShape(
+            reference_tensor="input0", scale=[1] * len(output_axes), offset=[0] * len(output_axes)
+        ),
+        halo=None if halo is None else [halo if ax in "yx" else 0 for ax in output_axes],
+    )
+    # only the tensor descriptions are needed for prediction, so the other (required) fields are left missing
+    model = Model.__new__(Model)
+    for f in dataclasses.fields(Model):
+        setattr(model, f.name, missing)
+    model.name, model.inputs, model.outputs = "stub", [ipt], [out]
+    return model
+
+
+def _create_stub_pipeline(func, halo=None, output_axes=("b", "c", "y", "x")):
+    """create a prediction pipeline for the stub model, which applies func to the numpy array of the input
+
+    Args:
+        func: function that is called with the input array and returns a list with the output array.
+        halo: halo of the output along y and x.
+        output_axes: axes of the output.
+    """
+    from bioimageio.core.prediction_pipeline import create_prediction_pipeline
+
+    model = _create_stub_model(halo, output_axes)
+    return create_prediction_pipeline(
+        bioimageio_model=model, model_adapter=_StubModelAdapter(bioimageio_model=model, func=func)
+    )
+
+
 def test_predict_image(any_model, tmpdir):
     from bioimageio.core.prediction import predict_image
 
@@ -165,6 +233,11 @@ def _test_predict_image_with_tiling(model, tmp_path, exp_mean_deviation):
     predict_image(model, inputs, [out_path], tiling=True)
     check_result()
 
+    # with memory mapped inputs and the tiles written straight to the output file
+    out_path.unlink()
+    predict_image(model, inputs, [out_path], tiling=True, mmap=True)
+    check_result()
+
 
 # prediction with tiling with the parameters above may not be suited for any model
 # so we only run it for the pytorch unet2d here
@@ -180,6 +253,10 @@ def test_predict_image_with_tiling_fixed_output_shape(unet2d_fixed_shape, tmp_pa
     _test_predict_image_with_tiling(unet2d_fixed_shape, tmp_path, 0.025)
 
 
+def test_predict_image_with_tiling_diff_output_shape(unet2d_diff_output_shape, tmp_path):
+    _test_predict_image_with_tiling(unet2d_diff_output_shape, tmp_path, 0.05)
+
+
 def test_predict_images(unet2d_nuclei_broad_model, tmp_path):
     from bioimageio.core.prediction import predict_images
 
@@ -200,3 +277,585 @@ def test_predict_images(unet2d_nuclei_broad_model, tmp_path):
         assert outp.exists()
         out = imageio.imread(outp)
         assert out.shape == shape
+
+
+def test_predict_images_parallel(unet2d_nuclei_broad_model, tmp_path):
+    from bioimageio.core.prediction import predict_images
+
+    n_images = 5
+    shape = (256, 256)
+
+    in_paths = []
+    out_paths = []
+    expected_paths = []
+    for i in range(n_images):
+        in_path = tmp_path / f"in{i}.tif"
+        im = np.random.randint(0, 255, size=shape).astype("uint8")
+        imageio.imwrite(in_path, im)
+        in_paths.append(in_path)
+        out_paths.append(tmp_path / f"out{i}.npy")
+        expected_paths.append(tmp_path / f"expected{i}.npy")
+
+    predict_images(unet2d_nuclei_broad_model, in_paths, expected_paths)
+    predict_images(unet2d_nuclei_broad_model, in_paths, out_paths, num_io_workers=2, prefetch=1)
+
+    for outp, expp in zip(out_paths, expected_paths):
+        assert_array_almost_equal(np.load(outp), np.load(expp), decimal=4)
+
+    predict_images(unet2d_nuclei_broad_model, in_paths, out_paths, num_workers=2)
+
+    for outp, expp in zip(out_paths, expected_paths):
+        assert_array_almost_equal(np.load(outp), np.load(expp), decimal=4)
+
+
+def test_predict_images_parallel_requires_model_source(tmp_path):
+    from bioimageio.core.prediction import predict_images
+
+    # the workers load the model from its source, a loaded model is not sent to them
+    with pytest.raises(ValueError):
+        predict_images(_create_stub_model(), [tmp_path / "in.npy"], [tmp_path / "out.npy"], num_workers=2)
+
+
+def test_predict_images_parallel_merges_shape_buckets(tmp_path, monkeypatch):
+    import pickle
+    from concurrent.futures import ThreadPoolExecutor
+
+    from bioimageio.core import ShapeBuckets, prediction
+
+    model = _create_stub_model()
+
+    def init_worker(rdf_source, weight_format, devices, num_threads):
+        prediction._worker_pipeline = _create_stub_pipeline(lambda x: [x + 1])
+
+    # run the workers in threads, which receive copies of the arguments like the worker processes
+    class CopyingExecutor(ThreadPoolExecutor):
+        def submit(self, fn, *args):
+            return super().submit(fn, *pickle.loads(pickle.dumps(args)))
+
+    def create_executor(max_workers, mp_context, initializer, initargs):
+        return CopyingExecutor(max_workers, initializer=initializer, initargs=initargs)
+
+    monkeypatch.setattr(prediction, "load_resource_description", lambda rdf: model)
+    monkeypatch.setattr(prediction, "_init_prediction_worker", init_worker)
+    monkeypatch.setattr(prediction, "ProcessPoolExecutor", create_executor)
+    monkeypatch.setattr(prediction, "_worker_pipeline", None)
+
+    in_paths, out_paths = [], []
+    for i, size in enumerate([20, 40, 60, 100]):
+        in_paths.append(tmp_path / f"in{i}.npy")
+        out_paths.append(tmp_path / f"out{i}.npy")
+        np.save(in_paths[-1], np.random.rand(1, 1, size, size).astype("float32"))
+
+    buckets = ShapeBuckets({"y": [32, 64], "x": [32, 64]})
+    prediction.predict_images("stub.yaml", in_paths, out_paths, padding=buckets, num_workers=2)
+
+    assert buckets.counts == {(("y", 32), ("x", 32)): 1, (("y", 64), ("x", 64)): 2}
+    assert buckets.misses == 1
+    for inp, outp in zip(in_paths, out_paths):
+        assert_array_almost_equal(np.load(outp), np.load(inp) + 1)
+
+
+@pytest.mark.parametrize("mmap", [False, True])
+def test_predict_image_releases_h5_files(tmp_path, monkeypatch, mmap):
+    h5py = pytest.importorskip("h5py")
+    from bioimageio.core import prediction
+
+    model = _create_stub_model()
+    monkeypatch.setattr(prediction, "load_resource_description", lambda rdf: model)
+    monkeypatch.setattr(
+        prediction, "create_prediction_pipeline", lambda **kwargs: _create_stub_pipeline(lambda x: [-x])
+    )
+
+    image = np.random.default_rng(0).random((1, 1, 64, 64), dtype="float32")
+    with h5py.File(tmp_path / "in.h5", "w") as f:
+        f.create_dataset("raw", data=image).attrs["axes"] = "bcyx"
+
+    out_path = str(tmp_path / "out.h5") + "/pred"
+    tiling = {"halo": {"x": 0, "y": 0}, "tile": {"x": 32, "y": 32}}
+    prediction.predict_image(model, str(tmp_path / "in.h5") + "/raw", out_path, tiling=tiling, mmap=mmap)
+
+    with h5py.File(tmp_path / "out.h5", "r") as f:
+        assert_array_almost_equal(f["pred"][()], -image)
+
+    # the files can only be truncated if they were closed after prediction
+    for name in ("in.h5", "out.h5"):
+        h5py.File(tmp_path / name, "w").close()
+
+
+def test_predict_images_batch_size(unet2d_nuclei_broad_model, tmp_path):
+    from bioimageio.core.prediction import predict_images
+
+    in_paths = []
+    out_paths = []
+    expected_paths = []
+    for i, shape in enumerate([(256, 256)] * 3 + [(128, 256)] * 2):
+        in_path = tmp_path / f"in{i}.npy"
+        np.save(in_path, np.random.randint(0, 255, size=(1, 1) + shape).astype("uint8"))
+        in_paths.append(in_path)
+        out_paths.append(tmp_path / f"out{i}.npy")
+        expected_paths.append(tmp_path / f"expected{i}.npy")
+
+    predict_images(unet2d_nuclei_broad_model, in_paths, expected_paths)
+    # the model has a fixed batch size of 1, so this falls back to predicting the images one by one
+    predict_images(unet2d_nuclei_broad_model, in_paths, out_paths, batch_size=2)
+
+    for outp, expp in zip(out_paths, expected_paths):
+        assert_array_almost_equal(np.load(outp), np.load(expp), decimal=4)
+
+
+def test_predict_stream(unet2d_nuclei_broad_model, tmp_path):
+    import xarray as xr
+    from bioimageio.core.prediction import predict, predict_stream
+    from bioimageio.core.prediction_pipeline import create_prediction_pipeline
+
+    spec = load_resource_description(unet2d_nuclei_broad_model)
+    assert isinstance(spec, Model)
+    image = np.load(str(spec.test_inputs[0]))
+    image_path = tmp_path / "image.npy"
+    np.save(image_path, image)
+
+    with create_prediction_pipeline(bioimageio_model=spec) as pp:
+        expected = predict(pp, image)
+        samples = [image, (xr.DataArray(image, dims=tuple(spec.inputs[0].axes)),), [image_path]]
+        results = list(predict_stream(pp, iter(samples), num_io_workers=1))
+
+    assert len(results) == len(samples)
+    for result in results:
+        assert len(result) == 1
+        assert_array_almost_equal(result[0], expected[0], decimal=4)
+
+
+def test_predict_stream_batches_samples():
+    import xarray as xr
+
+    from bioimageio.core.prediction import _predict_batch, predict_stream
+
+    batch_sizes = []
+
+    def func(x):
+        batch_sizes.append(x.shape[0])
+        return [x * 2 + 1]
+
+    rng = np.random.default_rng(0)
+    shapes = [(1, 1, 32, 32)] * 3 + [(1, 1, 48, 32)] + [(1, 1, 32, 32)] * 2
+    samples = [rng.random(shape, dtype="float32") for shape in shapes]
+    with _create_stub_pipeline(func) as pp:
+        results = list(predict_stream(pp, samples, batch_size=2))
+
+        # consecutive samples of the same shape are stacked into batches of up to 2 samples,
+        # the sample of a different shape ends the current batch
+        assert batch_sizes == [2, 1, 1, 2]
+        assert len(results) == len(samples)
+        for sample, result in zip(samples, results):
+            assert len(result) == 1
+            assert result[0].shape == sample.shape
+            assert_array_almost_equal(result[0], sample * 2 + 1, decimal=6)
+
+        # samples of different shapes are not stacked, but predicted one by one
+        batch_sizes.clear()
+        mixed = [[xr.DataArray(samples[i], dims=("b", "c", "y", "x"))] for i in (0, 3)]
+        results = _predict_batch(pp, mixed, None, None)
+        assert batch_sizes == [1, 1]
+        for sample, result in zip(mixed, results):
+            assert_array_almost_equal(result[0], sample[0] * 2 + 1, decimal=6)
+
+
+def test_apredict_dedicated_thread():
+    import asyncio
+    import threading
+
+    from bioimageio.core.prediction import apredict
+
+    threads = []
+
+    def func(x):
+        threads.append(threading.current_thread())
+        return [x + 1]
+
+    pp = _create_stub_pipeline(func)
+    image = np.zeros((1, 1, 32, 32), dtype="float32")
+
+    async def predict_concurrently():
+        async with pp:
+            return await asyncio.gather(*[apredict(pp, image) for _ in range(3)])
+
+    for result in asyncio.run(predict_concurrently()):
+        assert_array_almost_equal(result[0], image + 1)
+
+    # the model runs in one dedicated thread, which is shut down when the pipeline is unloaded
+    assert len(set(threads)) == 1
+    assert threads[0] is not threading.main_thread()
+    threads[0].join(timeout=10)
+    assert not threads[0].is_alive()
+
+
+def test_predict_with_tiling_custom_pipeline():
+    from bioimageio.core.prediction import predict_with_tiling
+    from bioimageio.core.prediction_pipeline import PredictionPipeline
+
+    class CustomPipeline(PredictionPipeline):
+        """pipeline that only implements the abstract methods and does not know about sample measures"""
+
+        def __init__(self):
+            self.stub = _create_stub_pipeline(lambda x: [x * 2])
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, exc_type, exc_val, exc_tb):
+            return False
+
+        def forward(self, *input_tensors):
+            return self.stub.forward(*input_tensors)
+
+        name = "custom"
+        input_specs = property(lambda self: self.stub.input_specs)
+        output_specs = property(lambda self: self.stub.output_specs)
+
+        def load(self):
+            pass
+
+        def unload(self):
+            pass
+
+    image = np.random.default_rng(0).random((1, 1, 64, 64), dtype="float32")
+    tiling = {"halo": {"x": 0, "y": 0}, "tile": {"x": 32, "y": 32}}
+    result = predict_with_tiling(CustomPipeline(), [image], tiling, image_measures=True)
+    assert_array_almost_equal(result[0], image * 2)
+
+
+def test_predict_with_dask(unet2d_nuclei_broad_model):
+    from bioimageio.core.prediction import predict_with_dask, predict_with_tiling
+    from bioimageio.core.prediction_pipeline import create_prediction_pipeline
+
+    da = pytest.importorskip("dask.array")
+    spec = load_resource_description(unet2d_nuclei_broad_model)
+    assert isinstance(spec, Model)
+    image = np.load(str(spec.test_inputs[0]))
+    tiling = {"halo": {"x": 32, "y": 32}, "tile": {"x": 256, "y": 256}}
+
+    with create_prediction_pipeline(bioimageio_model=spec) as pp:
+        expected = predict_with_tiling(pp, [image], tiling)
+        result = predict_with_dask(pp, da.from_array(image), tiling)
+        assert len(result) == 1
+        assert result[0].chunks is not None
+        assert result[0].shape == expected[0].shape
+        result = result[0].compute()
+
+    # the image borders differ, because dask mirrors the data at the borders instead of padding the border tiles
+    inner = {"x": slice(32, -32), "y": slice(32, -32)}
+    assert_array_almost_equal(result[inner], expected[0][inner], decimal=4)
+
+
+@pytest.mark.parametrize("halo", [4, 12])
+def test_predict_with_dask_stub(halo):
+    from bioimageio.core import predict_with_dask, predict_with_tiling
+
+    da = pytest.importorskip("dask.array")
+
+    def box_filter(x):
+        # the borders of the tiles are wrong, they are cropped as halo
+        return [sum(np.roll(x, (dy, dx), axis=(2, 3)) for dy in (-1, 0, 1) for dx in (-1, 0, 1)) / 9]
+
+    image = np.random.default_rng(0).random((1, 1, 100, 90), dtype="float32")
+    # with a halo of 12 the tiles without halo (8) are smaller than the halo, the chunks are enlarged to the halo
+    tiling = {"halo": {"x": halo, "y": halo}, "tile": {"x": 32, "y": 32}}
+    with _create_stub_pipeline(box_filter, halo=halo) as pp:
+        expected = predict_with_tiling(pp, [image], tiling)
+        result = predict_with_dask(pp, da.from_array(image), tiling)[0]
+        assert all(min(chunks) >= halo for chunks in result.chunks[2:])
+        result = result.compute()
+
+    # the image borders differ, because dask mirrors the data at the borders instead of padding the border tiles
+    inner = {"x": slice(1, -1), "y": slice(1, -1)}
+    assert_array_almost_equal(result[inner], expected[0][inner], decimal=6)
+
+
+def test_predict_with_tiling_tile_batch_size(unet2d_nuclei_broad_model):
+    from bioimageio.core.prediction import predict_with_tiling
+    from bioimageio.core.prediction_pipeline import create_prediction_pipeline
+
+    spec = load_resource_description(unet2d_nuclei_broad_model)
+    assert isinstance(spec, Model)
+    image = np.load(str(spec.test_inputs[0]))
+    tiling = {"halo": {"x": 32, "y": 32}, "tile": {"x": 256, "y": 256}}
+
+    with create_prediction_pipeline(bioimageio_model=spec) as pp:
+        expected = predict_with_tiling(pp, [image], tiling)
+        # the model has a fixed batch size of 1, so batching tiles falls back to single tile prediction
+        result = predict_with_tiling(pp, [image], tiling, tile_batch_size=4)
+
+    assert len(result) == len(expected) == 1
+    assert_array_almost_equal(result[0], expected[0], decimal=4)
+
+
+def test_predict_with_tiling_batches_tiles():
+    from bioimageio.core.prediction import predict_with_tiling
+
+    batch_sizes = []
+
+    def func(x):
+        batch_sizes.append(x.shape[0])
+        return [x * 2 + 1]
+
+    image = np.random.default_rng(0).random((1, 1, 150, 130), dtype="float32")
+    tiling = {"halo": {"x": 8, "y": 8}, "tile": {"x": 48, "y": 48}}
+    with _create_stub_pipeline(func, halo=8) as pp:
+        expected = predict_with_tiling(pp, [image], tiling)
+        assert set(batch_sizes) == {1}
+        n_tiles = len(batch_sizes)
+        batch_sizes.clear()
+
+        result = predict_with_tiling(pp, [image], tiling, tile_batch_size=4)
+
+    # the tiles reach the model in batches of 4 and a smaller last batch
+    assert batch_sizes == [4] * (n_tiles // 4) + ([n_tiles % 4] if n_tiles % 4 else [])
+    assert_array_almost_equal(result[0], expected[0], decimal=6)
+    assert_array_almost_equal(result[0], image * 2 + 1, decimal=6)
+
+
+def test_predict_with_tiling_batch_less_output():
+    from bioimageio.core.prediction import predict_with_tiling
+
+    batch_sizes = []
+
+    def func(x):
+        batch_sizes.append(x.shape[0])
+        return [x[0] * 2 + 1]
+
+    image = np.random.default_rng(0).random((1, 1, 96, 96), dtype="float32")
+    tiling = {"halo": {"x": 0, "y": 0}, "tile": {"x": 32, "y": 32}}
+    with _create_stub_pipeline(func, output_axes=("c", "y", "x")) as pp:
+        with pytest.warns(UserWarning, match="batch of 4 tiles"):
+            result = predict_with_tiling(pp, [image], tiling, tile_batch_size=4)
+
+    # the tiles of a batch can't be split from an output without batch axis, so they are predicted one by one
+    assert set(batch_sizes) == {1}
+    assert result[0].dims == ("c", "y", "x")
+    assert_array_almost_equal(result[0], image[0] * 2 + 1, decimal=6)
+
+
+@pytest.mark.parametrize("prefetch", [0, 3])
+def test_predict_with_tiling_outputs_sharing_memory_with_inputs(prefetch, monkeypatch):
+    from bioimageio.core.prediction import predict_with_tiling
+
+    image = np.random.default_rng(0).random((1, 1, 150, 130), dtype="float32")
+    tiling = {"halo": {"x": 8, "y": 8}, "tile": {"x": 48, "y": 48}}
+    with _create_stub_pipeline(lambda x: [x], halo=8) as pp:
+        # a pipeline without processing that returns its (pooled) input buffers of padded tiles and tile batches
+        monkeypatch.setattr(pp, "forward", lambda *inputs, sample_measures=None: list(inputs))
+        result = predict_with_tiling(pp, [image], tiling, tile_batch_size=2, prefetch=prefetch)
+
+    assert_array_almost_equal(result[0], image, decimal=6)
+
+
+def test_predict_image_with_tiling_multi_tensor(unet2d_multi_tensor, tmp_path):
+    from bioimageio.core.prediction import predict_image
+
+    spec = load_resource_description(unet2d_multi_tensor)
+    assert isinstance(spec, Model)
+    inputs = spec.test_inputs
+    assert len(inputs) > 1
+    expected = [np.load(str(p)) for p in spec.test_outputs]
+    assert len(expected) > 1
+
+    out_paths = [tmp_path / f"out{i}.npy" for i in range(len(expected))]
+    tiling = {"halo": {"x": 16, "y": 16}, "tile": {"x": 128, "y": 128}}
+    predict_image(unet2d_multi_tensor, inputs, out_paths, tiling=tiling)
+    for out_path, exp in zip(out_paths, expected):
+        assert out_path.exists()
+        res = np.load(out_path)
+        assert res.shape == exp.shape
+        assert np.abs(res - exp).mean() <= 0.05
+
+
+def test_predict_with_tiling_memmap(unet2d_nuclei_broad_model, tmp_path):
+    from bioimageio.core.prediction import predict_with_tiling
+    from bioimageio.core.prediction_pipeline import create_prediction_pipeline
+
+    spec = load_resource_description(unet2d_nuclei_broad_model)
+    assert isinstance(spec, Model)
+    np.save(tmp_path / "in.npy", np.load(str(spec.test_inputs[0])))
+    exp = np.load(str(spec.test_outputs[0]))
+
+    image = np.load(tmp_path / "in.npy", mmap_mode="r")
+    output = np.lib.format.open_memmap(tmp_path / "out.npy", mode="w+", dtype=exp.dtype, shape=exp.shape)
+    tiling = {"halo": {"x": 32, "y": 32}, "tile": {"x": 256, "y": 256}}
+    with create_prediction_pipeline(bioimageio_model=spec) as pp:
+        result = predict_with_tiling(pp, image, tiling, outputs=[output])
+    output.flush()
+
+    assert result[0] is output
+    res = np.load(tmp_path / "out.npy")
+    assert res.shape == exp.shape
+    assert np.abs(res - exp).mean() <= 0.012
+
+
+def test_predict_with_tiling_prefetch(unet2d_nuclei_broad_model):
+    from bioimageio.core.prediction import predict_with_tiling
+    from bioimageio.core.prediction_pipeline import create_prediction_pipeline
+
+    spec = load_resource_description(unet2d_nuclei_broad_model)
+    assert isinstance(spec, Model)
+    image = np.load(str(spec.test_inputs[0]))
+    tiling = {"halo": {"x": 32, "y": 32}, "tile": {"x": 128, "y": 128}}
+
+    with create_prediction_pipeline(bioimageio_model=spec) as pp:
+        expected = predict_with_tiling(pp, [image], tiling)
+        result = predict_with_tiling(pp, [image], tiling, prefetch=2)
+
+    assert_array_almost_equal(result[0], expected[0], decimal=4)
+
+
+def test_predict_with_tiling_image_measures(unet2d_nuclei_broad_model):
+    from bioimageio.core.prediction import predict, predict_with_tiling
+    from bioimageio.core.prediction_pipeline import create_prediction_pipeline
+
+    spec = load_resource_description(unet2d_nuclei_broad_model)
+    assert isinstance(spec, Model)
+    image = np.load(str(spec.test_inputs[0]))
+    tiling = {"halo": {"x": 32, "y": 32}, "tile": {"x": 128, "y": 128}}
+
+    with create_prediction_pipeline(bioimageio_model=spec) as pp:
+        expected = predict(pp, image)
+        result = predict_with_tiling(pp, [image], tiling, image_measures=True)
+        subsampled = predict_with_tiling(pp, [image], tiling, image_measures=True, image_measures_size=64 * 64)
+
+    # the tiles are normalized with the statistics of the full image, like the prediction without tiling
+    assert result[0].shape == expected[0].shape
+    assert np.abs(result[0] - expected[0]).mean() <= 0.012
+    assert np.abs(subsampled[0] - expected[0]).mean() <= 0.02
+
+
+def test_tiling_plan():
+    from bioimageio.core.prediction import TilingPlan
+
+    shape = {"z": 37, "y": 100, "x": 130}
+    tile_shape = {"z": 16, "y": 64, "x": 64}
+    halo = {"z": 2, "y": 8, "x": 8}
+    plan = TilingPlan.create(shape, tile_shape, halo)
+
+    # the inner tiles cover the image exactly once
+    covered = np.zeros(tuple(shape.values()), dtype=int)
+    for inner in plan.inner:
+        covered[tuple(slice(start, stop) for start, stop in inner)] += 1
+    assert (covered == 1).all()
+
+    # the outer tiles contain the inner tiles and are padded to the tile shape
+    assert (plan.outer[..., 0] <= plan.inner[..., 0]).all() and (plan.outer[..., 1] >= plan.inner[..., 1]).all()
+    padded_shape = plan.outer[..., 1] - plan.outer[..., 0] + plan.pad_width.sum(axis=-1)
+    assert (padded_shape == np.array(list(tile_shape.values()))).all()
+
+    restored = TilingPlan.from_dict(plan.to_dict())
+    assert restored.axes == plan.axes and restored.tile_shape == plan.tile_shape
+    for name in ("inner", "outer", "pad_width"):
+        np.testing.assert_array_equal(getattr(restored, name), getattr(plan, name))
+
+
+def test_tile_predicates():
+    import xarray as xr
+    from bioimageio.core.prediction import ForegroundMask, IntensityThreshold
+
+    shape = {"y": 100, "x": 100}
+    tile = {"y": slice(0, 50), "x": slice(50, 100)}
+    assert IntensityThreshold(0.5)([np.ones((1, 1, 50, 50))], tile, shape)
+    assert not IntensityThreshold(0.5)([np.zeros((1, 1, 50, 50))], tile, shape)
+
+    mask = np.zeros((10, 10), dtype=bool)
+    mask[2, 7] = True
+    predicate = ForegroundMask(xr.DataArray(mask, dims=("y", "x")))
+    assert predicate([], tile, shape)
+    assert not predicate([], {"y": slice(50, 100), "x": slice(50, 100)}, shape)
+
+
+def test_predict_with_tiling_skip_tiles(unet2d_nuclei_broad_model):
+    from bioimageio.core.prediction import IntensityThreshold, TileStats, predict_with_tiling
+    from bioimageio.core.prediction_pipeline import create_prediction_pipeline
+
+    spec = load_resource_description(unet2d_nuclei_broad_model)
+    assert isinstance(spec, Model)
+    image = np.load(str(spec.test_inputs[0]))
+    tiling = {"halo": {"x": 32, "y": 32}, "tile": {"x": 128, "y": 128}}
+
+    stats = TileStats()
+    with create_prediction_pipeline(bioimageio_model=spec) as pp:
+        result = predict_with_tiling(
+            pp, [image], tiling, tile_predicate=IntensityThreshold(np.inf), skip_fill_value=-1.0, tile_stats=stats
+        )
+
+    assert (result[0] == -1.0).all()
+    assert stats.predicted == 0 and stats.skipped > 0 and stats.skipped_fraction == 1.0
+
+
+def test_predict_with_tiling_tile_stats():
+    from bioimageio.core.prediction import IntensityThreshold, TileStats, predict_with_tiling
+
+    # only the tiles of the upper half of the image have foreground
+    image = np.zeros((1, 1, 128, 64), dtype="float32")
+    image[:, :, :64] = 1
+    tiling = {"halo": {"x": 0, "y": 0}, "tile": {"x": 32, "y": 32}}
+    stats = TileStats()
+    with _create_stub_pipeline(lambda x: [x * 2]) as pp:
+        result = predict_with_tiling(pp, [image], tiling, tile_predicate=IntensityThreshold(0.5), tile_stats=stats)
+        assert (stats.predicted, stats.skipped) == (4, 4)
+        assert stats.skipped_fraction == 0.5
+
+        # the counts accumulate over calls
+        predict_with_tiling(pp, [image], tiling, tile_stats=stats)
+        assert (stats.predicted, stats.skipped) == (12, 4)
+
+    assert_array_almost_equal(result[0], image * 2)
+
+
+def test_shape_buckets():
+    from bioimageio.core import ShapeBuckets
+    from bioimageio.core.resource_io import nodes
+
+    spec = nodes.InputTensor(
+        name="input0",
+        data_type="float32",
+        axes=("b", "c", "y", "x"),
+        shape=nodes.ParametrizedInputShape(min=[1, 1, 32, 32], step=[0, 0, 16, 16]),
+        preprocessing=[],
+    )
+    buckets = ShapeBuckets.from_spec(spec, {"y": 256, "x": 256})
+    assert buckets.sizes == {"y": [32, 64, 128, 256], "x": [32, 64, 128, 256]}
+
+    assert buckets.get_padding(spec, {"b": 1, "c": 1, "y": 100, "x": 30}) == {"mode": "fixed", "y": 128, "x": 32}
+    assert buckets.get_padding(spec, {"b": 1, "c": 1, "y": 120, "x": 20}) == {"mode": "fixed", "y": 128, "x": 32}
+    # larger than all buckets along x: pad to the next valid size
+    assert buckets.get_padding(spec, {"b": 1, "c": 1, "y": 60, "x": 300}) == {"mode": "fixed", "y": 64, "x": 304}
+    assert buckets.counts == {(("y", 128), ("x", 32)): 2}
+    assert buckets.misses == 1
+    assert buckets.hit_rate == 2 / 3
+
+    with pytest.raises(ValueError):
+        ShapeBuckets({"x": [100]}).get_padding(spec, {"b": 1, "c": 1, "y": 32, "x": 32})
+
+
+def test_shape_buckets_count_samples():
+    from bioimageio.core.prediction import ShapeBuckets, predict_stream
+
+    shapes = []
+
+    def func(x):
+        shapes.append(x.shape)
+        return [x]
+
+    rng = np.random.default_rng(0)
+    sizes = [(30, 30), (30, 30), (40, 20), (100, 60), (200, 20)]
+    samples = [rng.random((1, 1) + size, dtype="float32") for size in sizes]
+    with _create_stub_pipeline(func) as pp:
+        buckets = ShapeBuckets.from_spec(pp.input_specs[0], {"y": 128, "x": 128})
+        assert buckets.sizes == {"y": [32, 64, 128], "x": [32, 64, 128]}
+        results = list(predict_stream(pp, samples, padding=buckets, batch_size=2))
+
+    # each axis is padded to the smallest bucket it fits into, the two first samples are predicted as one batch
+    assert shapes == [(2, 1, 32, 32), (1, 1, 64, 32), (1, 1, 128, 64), (1, 1, 208, 32)]
+    for sample, result in zip(samples, results):
+        assert_array_almost_equal(result[0], sample)
+
+    # the buckets are counted per sample, not per batch
+    assert buckets.counts == {(("y", 32), ("x", 32)): 2, (("y", 64), ("x", 32)): 1, (("y", 128), ("x", 64)): 1}
+    assert buckets.misses == 1
+    assert buckets.hit_rate == 4 / 5